@@ -0,0 +1,243 @@
+"""
+Benchmark: project generation end to end and its hot helpers.
+
+Synthesizes a template of configurable shape (file count, file size,
+placeholder density, rule count and brace complexity), then times
+create_project() with a cold and a warm render plan, and separately
+expand_brace_pattern(), matches_any_pattern(), replace_in_file() and
+apply_variable_substitution() over the same template. Everything runs under
+a temporary HOME, so the user's config and caches are never touched.
+
+Usage:
+    python benchmarks/bench_generate.py [--files 500] [--file-size 4096]
+        [--placeholder-density 0.05] [--rules 4] [--brace-options 4]
+        [--repeat 5] [--jobs 1] [--json results.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+EXTENSIONS = ['py', 'md', 'js', 'jsx', 'json', 'css', 'html', 'ts', 'txt', 'yml', 'xml', 'toml']
+DIRECTORIES = ['src', 'lib', 'components', 'pages', 'utils', 'assets', 'api', 'tests', 'docs']
+WORDS = ['alpha', 'beta', 'gamma', 'delta', 'render', 'template', 'value', 'return', 'import', 'const']
+
+# Replacement keys per rule
+KEYS_PER_RULE = 3
+
+
+def rule_key(rule, key):
+    return f"PLACEHOLDER_{rule}_{key}"
+
+
+def build_template_config(rules, brace_options):
+    """Returns a template.json with `rules` replace rules, each globbing `brace_options` extensions."""
+    replace = []
+    for rule in range(rules):
+        extensions = [EXTENSIONS[(rule + offset) % len(EXTENSIONS)] for offset in range(brace_options)]
+        replace.append({
+            'glob': '{**/*,*}.{%s}' % ','.join(extensions),
+            'values': {rule_key(rule, key): '{{project_name}} %d' % key for key in range(KEYS_PER_RULE)},
+        })
+    return {
+        'id': 'bench',
+        'name': 'Benchmark template',
+        'prompts': {
+            'project_name': {'label': 'Project name', 'default': 'Bench', 'format': 'text'},
+            'package_name': {'label': 'Package name', 'default': 'benchpkg', 'format': 'snake_case'},
+        },
+        'rename': {'benchpkg': '{{package_name}}'},
+        'replace': replace,
+    }
+
+
+def synthesize_template(path, files, file_size, density, rules, seed=0):
+    """
+    Writes a template of `files` text files of about `file_size` bytes under
+    `path`. Each line carries a placeholder of a random rule with probability
+    `density`. Returns the relative file paths.
+    """
+    rng = random.Random(seed)
+    relative_paths = []
+    for index in range(files):
+        depth = rng.randint(0, 3)
+        parts = ['benchpkg'] if rng.random() < 0.3 else []
+        parts += [rng.choice(DIRECTORIES) + str(rng.randint(0, 4)) for _ in range(depth)]
+        parts.append(f"file{index}.{rng.choice(EXTENSIONS)}")
+        relative_path = '/'.join(parts)
+        relative_paths.append(relative_path)
+
+        lines = []
+        size = 0
+        while size < file_size:
+            line = ' '.join(rng.choice(WORDS) for _ in range(8))
+            if rules and rng.random() < density:
+                line += ' ' + rule_key(rng.randrange(rules), rng.randrange(KEYS_PER_RULE))
+            lines.append(line)
+            size += len(line) + 1
+
+        file_path = os.path.join(path, *parts)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+    return relative_paths
+
+
+def measure(name, repeat, func, setup=None, files=0, size=0):
+    """Runs func `repeat` times (after `setup`, untimed) and returns a result record."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {
+        'name': name,
+        'best_seconds': min(times),
+        'mean_seconds': statistics.mean(times),
+        'runs': repeat,
+        'files': files,
+        'bytes': size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=500, help='Number of template files (default: 500)')
+    parser.add_argument('--file-size', type=int, default=4096, help='Approximate bytes per file (default: 4096)')
+    parser.add_argument('--placeholder-density', type=float, default=0.05,
+                        help='Probability that a line contains a placeholder (default: 0.05)')
+    parser.add_argument('--rules', type=int, default=4, help='Number of replace rules (default: 4)')
+    parser.add_argument('--brace-options', type=int, default=4, help='Extensions per rule glob (default: 4)')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetitions per measurement (default: 5)')
+    parser.add_argument('--jobs', type=int, default=1, help='Worker threads for create_project (default: 1)')
+    parser.add_argument('--json', metavar='FILE', help="Write machine-readable results to FILE ('-' for stdout)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-generate-')
+    try:
+        # Isolate config and caches before the package computes its paths
+        home = os.path.join(workdir, 'home')
+        os.makedirs(os.path.join(home, '.boilerplates'))
+        with open(os.path.join(home, '.boilerplates', 'config.json'), 'w', encoding='utf-8') as f:
+            json.dump({'public_repo_url': '', 'private_repos': []}, f)
+        os.environ['HOME'] = home
+        sys.path.insert(0, REPO_ROOT)
+
+        from boilerplates import cli
+        from boilerplates import config as cfg
+        from boilerplates.render import expand_brace_pattern, matches_any_pattern
+
+        templates_dir = os.path.join(workdir, 'templates')
+        template_path = os.path.join(templates_dir, 'bench', 'synthetic')
+        relative_paths = synthesize_template(
+            template_path, args.files, args.file_size, args.placeholder_density, args.rules)
+        template_config = build_template_config(args.rules, args.brace_options)
+        with open(os.path.join(template_path, 'template.json'), 'w', encoding='utf-8') as f:
+            json.dump(template_config, f, indent=2)
+        total_bytes = sum(os.path.getsize(os.path.join(template_path, p)) for p in relative_paths)
+        cli.get_templates_dir = lambda: cli.Path(templates_dir)
+
+        variables = {'project_name': 'Bench Project', 'package_name': 'bench_project'}
+        globs = [rule['glob'] for rule in template_config['replace']]
+        replacements = {}
+        for rule in template_config['replace']:
+            for old, new in rule['values'].items():
+                replacements[old] = cli.apply_variable_substitution(new, variables)
+
+        output_dir = os.path.join(workdir, 'output')
+        plans_dir = str(cfg.CACHE_DIR / 'plans')
+
+        def fresh_output():
+            shutil.rmtree(output_dir, ignore_errors=True)
+            os.makedirs(output_dir)
+
+        def cold_output():
+            fresh_output()
+            shutil.rmtree(plans_dir, ignore_errors=True)
+
+        def create():
+            with contextlib.redirect_stdout(io.StringIO()):
+                if not cli.create_project('bench', 'synthetic', 'Bench Project', output_dir=output_dir, jobs=args.jobs):
+                    raise RuntimeError('create_project failed')
+
+        scratch = os.path.join(workdir, 'scratch')
+
+        def fresh_scratch():
+            shutil.rmtree(scratch, ignore_errors=True)
+            shutil.copytree(template_path, scratch)
+
+        def replace_all():
+            for relative_path in relative_paths:
+                cli.replace_in_file(os.path.join(scratch, relative_path), replacements)
+
+        def expand_all():
+            for _ in range(1000):
+                for glob in globs:
+                    expand_brace_pattern(glob)
+
+        def match_all():
+            for relative_path in relative_paths:
+                matches_any_pattern(relative_path, globs)
+
+        substitution_inputs = [value for rule in template_config['replace'] for value in rule['values'].values()]
+
+        def substitute_all():
+            for _ in range(1000):
+                for text in substitution_inputs:
+                    cli.apply_variable_substitution(text, variables)
+
+        results = [
+            measure('create_project (cold plan)', args.repeat, create, cold_output, len(relative_paths), total_bytes),
+            measure('create_project (warm plan)', args.repeat, create, fresh_output, len(relative_paths), total_bytes),
+            measure('expand_brace_pattern x1000', args.repeat, expand_all),
+            measure('matches_any_pattern', args.repeat, match_all, files=len(relative_paths)),
+            measure('replace_in_file', args.repeat, replace_all, fresh_scratch, len(relative_paths), total_bytes),
+            measure('apply_variable_substitution x1000', args.repeat, substitute_all),
+        ]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    parameters = {
+        'files': args.files,
+        'file_size': args.file_size,
+        'placeholder_density': args.placeholder_density,
+        'rules': args.rules,
+        'brace_options': args.brace_options,
+        'repeat': args.repeat,
+        'jobs': args.jobs,
+    }
+    print(f"{args.files} files x ~{args.file_size} bytes, {args.rules} rules of {args.brace_options} "
+          f"extensions, placeholder density {args.placeholder_density}", file=sys.stderr)
+    print(f"{'benchmark':<36} {'best':>10} {'mean':>10} {'MB/s':>8}", file=sys.stderr)
+    for result in results:
+        throughput = ''
+        if result['bytes']:
+            throughput = f"{result['bytes'] / result['best_seconds'] / 1e6:.1f}"
+        print(f"{result['name']:<36} {result['best_seconds'] * 1000:>8.1f}ms "
+              f"{result['mean_seconds'] * 1000:>8.1f}ms {throughput:>8}", file=sys.stderr)
+
+    if args.json:
+        report = {'parameters': parameters, 'python': sys.version.split()[0], 'results': results}
+        if args.json == '-':
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+                f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
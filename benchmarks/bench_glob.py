@@ -0,0 +1,103 @@
+"""
+Micro-benchmark: compiled PathMatcher vs. the legacy fnmatch loop.
+
+Builds a synthetic template tree of relative paths (50k files by default) and
+times how long each implementation takes to classify every path against the
+replace-rule globs used by the bundled templates.
+
+Usage:
+    python benchmarks/bench_glob.py [--files 50000] [--repeat 3]
+"""
+
+import argparse
+import fnmatch
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from boilerplates.render import PathMatcher, expand_brace_pattern  # noqa: E402
+
+GLOBS = [
+    '{**/*,*}.{py,md,yml,yaml,txt}',
+    '{**/*,*}.{php,md,txt,css,js,json}',
+    '**/*.{js,jsx,json,html,md}',
+    '**/*.{ts,json,xml,css,resx,md}',
+    '.env*',
+]
+
+EXTENSIONS = ['py', 'md', 'js', 'jsx', 'json', 'css', 'html', 'png', 'ts', 'txt', 'yml', 'svg', 'lock']
+DIRECTORIES = ['src', 'lib', 'components', 'pages', 'utils', 'assets', 'api', 'tests', 'docs']
+
+
+def legacy_matches_any_pattern(file_path, patterns):
+    """The pre-PathMatcher implementation: two fnmatch calls per pattern."""
+    file_str = str(file_path)
+    file_str_posix = file_str.replace('\\', '/')
+
+    for pattern in patterns:
+        if fnmatch.fnmatch(file_str, pattern) or fnmatch.fnmatch(file_str_posix, pattern):
+            return True
+    return False
+
+
+def synthetic_tree(file_count, seed=0):
+    """Returns file_count relative paths spread over a few directory levels."""
+    rng = random.Random(seed)
+    paths = []
+    for index in range(file_count):
+        depth = rng.randint(0, 4)
+        parts = [rng.choice(DIRECTORIES) + str(rng.randint(0, 9)) for _ in range(depth)]
+        parts.append(f"file{index}.{rng.choice(EXTENSIONS)}")
+        paths.append('/'.join(parts))
+    paths.append('.env.example')
+    return paths
+
+
+def best_of(repeat, func):
+    """Runs func `repeat` times and returns (best seconds, last result)."""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=50000, help='Number of synthetic files (default: 50000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions per measurement, best is reported')
+    args = parser.parse_args()
+
+    paths = synthetic_tree(args.files)
+    print(f"{len(paths)} files, {len(GLOBS)} rules")
+    print(f"{'glob':<36} {'fnmatch':>10} {'compiled':>10} {'speedup':>8} {'matches':>15}")
+
+    total_legacy = total_compiled = 0.0
+    for glob in GLOBS:
+        patterns = expand_brace_pattern(glob)
+        legacy_time, legacy_hits = best_of(
+            args.repeat, lambda: sum(1 for p in paths if legacy_matches_any_pattern(p, patterns)))
+
+        # Compilation is part of the measured cost, as it happens once per rule
+        def compiled():
+            matcher = PathMatcher(glob)
+            return sum(1 for p in paths if matcher.match(p))
+
+        compiled_time, compiled_hits = best_of(args.repeat, compiled)
+        total_legacy += legacy_time
+        total_compiled += compiled_time
+        print(f"{glob:<36} {legacy_time * 1000:>8.1f}ms {compiled_time * 1000:>8.1f}ms "
+              f"{legacy_time / compiled_time:>7.1f}x {legacy_hits:>7}/{compiled_hits:<7}")
+
+    print(f"{'total':<36} {total_legacy * 1000:>8.1f}ms {total_compiled * 1000:>8.1f}ms "
+          f"{total_legacy / total_compiled:>7.1f}x")
+    print("Match counts differ where '**/' must also match top-level files.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Startup benchmark for the boilerplates CLI.
+
+Measures the cumulative import time of boilerplates.cli with
+`python -X importtime` and fails if it exceeds the budget, or if a module
+that should only be loaded on demand (prompt toolkit, HTTP client, process
+pools, ...) is imported at startup.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10] [--budget-ms 25]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules that must stay out of the startup path
+DEFERRED_MODULES = (
+    'InquirerPy',
+    'prompt_toolkit',
+    'requests',
+    'subprocess',
+    'concurrent.futures',
+    'importlib.metadata',
+    'hashlib',
+)
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+
+
+def run_importtime(env):
+    """
+    Imports boilerplates.cli in a fresh interpreter and returns
+    {module: (self_us, cumulative_us)} for the modules that import pulled in.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import boilerplates.cli'],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        if match.group(4) == 'site' and not match.group(3).strip(' '):
+            # Everything so far was interpreter start-up, not our import
+            modules = {}
+            continue
+        modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return modules
+
+
+def run_help(env):
+    """Returns the wall time of `python -m boilerplates.cli --help` in seconds."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'boilerplates.cli', '--help'],
+                   env=env, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help='Number of measured runs (default: 10)')
+    parser.add_argument('--budget-ms', type=float, default=25.0,
+                        help='Maximum median import time of boilerplates.cli (default: 25ms)')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_ROOT, env.get('PYTHONPATH')]))
+    # Measure the steady state, with bytecode caches written by the warm-up run
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+    modules = run_importtime(env)
+    samples = []
+    for _ in range(args.runs):
+        modules = run_importtime(env)
+        samples.append(modules['boilerplates.cli'][1] / 1000)
+    help_times = [run_help(env) * 1000 for _ in range(args.runs)]
+
+    median = statistics.median(samples)
+    print(f"import boilerplates.cli: median {median:.1f}ms, min {min(samples):.1f}ms over {args.runs} runs")
+    print(f"boilerplates --help:     median {statistics.median(help_times):.1f}ms wall (interpreter included)")
+
+    print("\nSlowest imports under boilerplates.cli (self time, last run):")
+    for name, (self_us, _) in sorted(modules.items(), key=lambda item: -item[1][0])[:8]:
+        print(f"  {self_us / 1000:>6.2f}ms  {name}")
+
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"median import time {median:.1f}ms exceeds budget of {args.budget_ms:.1f}ms")
+    for name in sorted(modules):
+        if any(name == m or name.startswith(m + '.') for m in DEFERRED_MODULES):
+            failures.append(f"'{name}' is imported at startup")
+
+    if failures:
+        print("\nFAIL:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"\nOK: within the {args.budget_ms:.1f}ms budget")
+
+
+if __name__ == '__main__':
+    main()
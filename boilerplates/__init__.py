@@ -1,11 +1,20 @@
 """
 Boilerplate Manager - A CLI tool for managing project templates.
 """
-import importlib.metadata
-
-try:
-    __version__ = importlib.metadata.version("boilerplate-manager")
-except importlib.metadata.PackageNotFoundError:
-    __version__ = "unknown"
 
 __author__ = "Juan"
+
+
+def __getattr__(name):
+    # Resolve __version__ on first access: importlib.metadata is slow to load
+    # and scans every installed distribution, which every CLI call would pay.
+    if name == "__version__":
+        import importlib.metadata
+
+        try:
+            version = importlib.metadata.version("boilerplate-manager")
+        except importlib.metadata.PackageNotFoundError:
+            version = "unknown"
+        globals()["__version__"] = version
+        return version
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,175 @@
+"""
+Rendering templates straight into zip or tar.gz archives.
+"""
+
+import io
+import os
+import shutil
+import stat
+import time
+
+from .render import content_hash, substitute
+
+# Archive formats `create --format` accepts, with their file extensions
+ARCHIVE_FORMATS = {
+    'zip': '.zip',
+    'tar.gz': '.tar.gz',
+}
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+class _HashingReader:
+    """Wraps a binary file, hashing every chunk read from it on the way into the archive."""
+
+    def __init__(self, f):
+        import hashlib
+        self._f = f
+        self._digest = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self._f.read(size)
+        self._digest.update(data)
+        return data
+
+    def hexdigest(self):
+        return self._digest.hexdigest()
+
+
+class ZipSink:
+    """Writes project entries into a zip archive. Works on unseekable outputs such as stdout."""
+
+    def __init__(self, fileobj):
+        import zipfile
+        self._zipfile = zipfile
+        self.archive = zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED)
+
+    def _info(self, name, source):
+        st = os.stat(source)
+        # ZIP can't store times outside 1980-2107; clamp them as zip tools do,
+        # since reproducible checkouts (SOURCE_DATE_EPOCH=0) date files to 1970
+        date_time = time.localtime(st.st_mtime)[:6]
+        date_time = min(max(date_time, (1980, 1, 1, 0, 0, 0)), (2107, 12, 31, 23, 59, 59))
+        if stat.S_ISDIR(st.st_mode):
+            info = self._zipfile.ZipInfo(name + '/', date_time)
+            info.external_attr = (st.st_mode & 0xFFFF) << 16 | 0x10
+        else:
+            info = self._zipfile.ZipInfo(name, date_time)
+            info.external_attr = (st.st_mode & 0xFFFF) << 16
+            info.file_size = st.st_size
+        info.compress_type = self._zipfile.ZIP_DEFLATED
+        return info
+
+    def add_directory(self, name, source):
+        self.archive.writestr(self._info(name, source), b'')
+
+    def add_file(self, name, source, data=None):
+        """
+        Adds a file with the metadata of `source`; its content is streamed from
+        it unless `data` is given. Returns the SHA-256 of streamed content.
+        """
+        info = self._info(name, source)
+        if data is not None:
+            self.archive.writestr(info, data)
+            return None
+        with open(source, 'rb') as fsrc, self.archive.open(info, 'w') as fdst:
+            reader = _HashingReader(fsrc)
+            shutil.copyfileobj(reader, fdst, _CHUNK_SIZE)
+        return reader.hexdigest()
+
+    def add_bytes(self, name, data):
+        info = self._zipfile.ZipInfo(name, time.localtime()[:6])
+        info.external_attr = 0o644 << 16
+        info.compress_type = self._zipfile.ZIP_DEFLATED
+        self.archive.writestr(info, data)
+
+    def close(self):
+        self.archive.close()
+
+
+class TarSink:
+    """Writes project entries into a gzip-compressed tar stream."""
+
+    def __init__(self, fileobj):
+        import tarfile
+        self._tarfile = tarfile
+        # Stream mode ('w|gz') never seeks; dereference stores what symlinks point at
+        self.archive = tarfile.open(fileobj=fileobj, mode='w|gz', dereference=True)
+
+    def _info(self, name, source):
+        info = self.archive.gettarinfo(source, name)
+        info.uid = info.gid = 0
+        info.uname = info.gname = ''
+        return info
+
+    def add_directory(self, name, source):
+        self.archive.addfile(self._info(name, source))
+
+    def add_file(self, name, source, data=None):
+        """
+        Adds a file with the metadata of `source`; its content is streamed from
+        it unless `data` is given. Returns the SHA-256 of streamed content.
+        """
+        info = self._info(name, source)
+        if data is not None:
+            info.size = len(data)
+            self.archive.addfile(info, io.BytesIO(data))
+            return None
+        with open(source, 'rb') as f:
+            reader = _HashingReader(f)
+            self.archive.addfile(info, reader)
+        return reader.hexdigest()
+
+    def add_bytes(self, name, data):
+        info = self._tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mode = 0o644
+        info.mtime = int(time.time())
+        self.archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.archive.close()
+
+
+def open_sink(archive_format, fileobj):
+    """Returns the sink writing `archive_format` to a binary file object."""
+    if archive_format == 'zip':
+        return ZipSink(fileobj)
+    if archive_format == 'tar.gz':
+        return TarSink(fileobj)
+    raise ValueError(f"Unknown archive format '{archive_format}'")
+
+
+def render_archive(sink, root, template_path, directories, files, outputs=None):
+    """
+    Renders a resolved plan into an archive sink under the `root` directory.
+
+    Files without replacers are streamed from the template into the archive
+    in chunks; others are read once and substituted in memory. Nothing is
+    written to disk. If `outputs` is a dict, it is filled with destination ->
+    (source, source_hash, output_hash) as render.render_template() does, with
+    the hashes computed from the chunks or bytes passing through, so no file
+    is read twice. Returns the number of files whose content changed.
+    """
+    for directory in directories:
+        sink.add_directory(f"{root}/{directory}" if directory else root, template_path)
+
+    count = 0
+    for source, destination, replacers in files:
+        name = f"{root}/{destination}"
+        if not replacers:
+            source_hash = output_hash = sink.add_file(name, source)
+        else:
+            with open(source, 'rb') as f:
+                data = f.read()
+            source_hash = content_hash(data)
+            data, changed, error = substitute(data, replacers)
+            if error:
+                print(f"Warning: Could not process {destination}: {error}")
+            sink.add_file(name, source, data)
+            output_hash = content_hash(data) if changed else source_hash
+        if output_hash != source_hash:
+            count += 1
+        if outputs is not None:
+            outputs[destination] = (source, source_hash, output_hash)
+    return count
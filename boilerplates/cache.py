@@ -0,0 +1,440 @@
+"""
+Size accounting and LRU eviction for ~/.boilerplates/cache.
+"""
+
+import json
+import os
+import re
+import shutil
+import stat
+import threading
+import time
+import zlib
+
+from contextlib import contextmanager
+
+from . import config as cfg
+
+USAGE_FILE = cfg.CACHE_DIR / "usage.json"
+
+# Lock files of cache entries; never evicted, as deleting a held lock file
+# would let the next process lock a different file
+LOCKS_DIR = cfg.CACHE_DIR / "locks"
+
+# Top-level cache entries other than template checkouts. The template store
+# and render plans are evicted as a whole; metadata is small, needed offline,
+# and only removed by clear().
+GROUP_ENTRIES = {
+    'objects': 'store',
+    'plans': 'plans',
+}
+METADATA_ENTRIES = ('registry', 'catalogue.json', 'usage.json')
+
+# Uses closer together than this many seconds are recorded once, so batches
+# don't rewrite the usage file for every project
+USAGE_RESOLUTION = 60
+
+SIZE_UNITS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3, 't': 1024 ** 4}
+
+# Windows (msvcrt) only has exclusive locks, so there "shared" locks are
+# exclusive too and are never waited for (see acquire())
+SHARED_LOCKS = os.name != 'nt'
+
+_usage_lock = threading.Lock()
+
+# Entry key -> open lock file of the shared locks this process holds until exit
+_held = {}
+_held_lock = threading.Lock()
+
+
+def _lock_path(path):
+    """Returns the lock file of a cache entry, e.g. locks/github.com_user_repo-1a2b3c4d.lock."""
+    key = entry_key(path) if os.path.isabs(os.fspath(path)) else os.fspath(path)
+    name = re.sub(r'[^A-Za-z0-9._-]+', '_', key)[:100]
+    return LOCKS_DIR / f"{name}-{zlib.crc32(key.encode('utf-8')):08x}.lock"
+
+
+def _flock(f, shared, blocking=True):
+    """Locks an open lock file; returns False if `blocking` is off and the lock is taken."""
+    try:
+        import fcntl
+    except ImportError:
+        # Windows has no shared byte-range locks in msvcrt; readers lock exclusively
+        import msvcrt
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(0.1)
+
+    flags = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+    try:
+        fcntl.flock(f.fileno(), flags if blocking else flags | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def acquire(path, shared=False, blocking=True):
+    """Locks a cache entry and returns the open lock file, or None if the lock is taken and not waited for."""
+    # Shared locks are for using an entry, exclusive ones for changing or
+    # deleting it. Unshareable shared locks are never waited for: processes
+    # holding entries until exit (see hold()) would deadlock on each other,
+    # so callers go on without one
+    if shared and not SHARED_LOCKS:
+        blocking = False
+    lock_path = _lock_path(path)
+    LOCKS_DIR.mkdir(parents=True, exist_ok=True)
+    f = open(lock_path, 'a+b')
+    try:
+        if _flock(f, shared, blocking):
+            return f
+    except BaseException:
+        f.close()
+        raise
+    f.close()
+    return None
+
+
+def relock(f, shared, blocking=True):
+    """
+    Switches an acquired lock between shared and exclusive. The switch isn't
+    atomic: if `blocking` is off and it fails, the lock is lost and has to be
+    taken again. Returns whether it succeeded. Without SHARED_LOCKS the lock
+    stays exclusive, as msvcrt can't lock a region its own handle holds.
+    """
+    if not SHARED_LOCKS:
+        return True
+    return _flock(f, shared, blocking)
+
+
+@contextmanager
+def locked(path, shared=False):
+    """Holds a lock on a cache entry for the duration of a block."""
+    f = acquire(path, shared)
+    try:
+        yield
+    finally:
+        f.close()
+
+
+def fetching(path):
+    """
+    Holds the fetch lock of a cache entry for a block. It serializes fetches
+    without blocking readers, so concurrent invocations wait for one fetch
+    instead of duplicating it.
+    """
+    return locked(entry_key(path) + '.fetch')
+
+
+def hold(path, f):
+    """
+    Keeps the shared lock `f` on an entry until the process exits, so it isn't
+    changed while in use. `f` may be None when acquire() couldn't take it.
+    """
+    if f is None:
+        return
+    key = entry_key(path)
+    with _held_lock:
+        if key in _held:
+            f.close()
+        else:
+            _held[key] = f
+
+
+def is_held(path):
+    """Whether this process holds an entry through hold()."""
+    with _held_lock:
+        return entry_key(path) in _held
+
+
+def entry_key(path):
+    """Returns the usage key of a cache path: its checkout, store or plans directory relative to the cache."""
+    relative = os.path.relpath(os.fspath(path), cfg.CACHE_DIR).replace(os.sep, '/')
+    top = relative.split('/', 1)[0]
+    return top if top in GROUP_ENTRIES else relative
+
+
+def _read_usage():
+    try:
+        with open(USAGE_FILE, 'r', encoding='utf-8') as f:
+            usage = json.load(f)
+        return usage if isinstance(usage, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_usage(usage):
+    try:
+        cfg.write_json(USAGE_FILE, usage, indent=2, sort_keys=True)
+    except OSError as e:
+        print(f"Warning: Could not record cache usage: {e}")
+
+
+def touch(*paths, size=None):
+    """
+    Records that cache entries were just used. `size`, when known (e.g.
+    right after a fetch), is recorded for all of them.
+    """
+    now = time.time()
+    with _usage_lock, locked('usage.json'):
+        usage = _read_usage()
+        changed = False
+        for path in paths:
+            record = usage.setdefault(entry_key(path), {})
+            if size is not None:
+                record['size'] = size
+                changed = True
+            if now - record.get('last_used', 0) >= USAGE_RESOLUTION:
+                record['last_used'] = now
+                changed = True
+        if changed:
+            _write_usage(usage)
+
+
+def disk_usage(path):
+    """Returns the bytes a file or directory tree occupies on disk, counting hardlinked files once."""
+    total = 0
+    seen = set()
+    stack = [os.fspath(path)]
+    while stack:
+        current = stack.pop()
+        try:
+            st = os.lstat(current)
+        except OSError:
+            continue
+        if st.st_nlink > 1 and not stat.S_ISDIR(st.st_mode):
+            if (st.st_dev, st.st_ino) in seen:
+                continue
+            seen.add((st.st_dev, st.st_ino))
+        total += st.st_blocks * 512 if hasattr(st, 'st_blocks') else st.st_size
+        if stat.S_ISDIR(st.st_mode):
+            try:
+                stack.extend(os.path.join(current, name) for name in os.listdir(current))
+            except OSError:
+                pass
+    return total
+
+
+def _find_checkouts(directory, found):
+    """Collects the git checkouts below a cache directory, without descending into them."""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    if '.git' in names:
+        found.append(directory)
+        return
+    for name in names:
+        path = os.path.join(directory, name)
+        # Dot names are clones still being staged by remote.fetch_template()
+        if not name.startswith('.') and os.path.isdir(path) and not os.path.islink(path):
+            _find_checkouts(path, found)
+
+
+def list_entries():
+    """
+    Measures the cache. Returns one dict per entry with its key, path, kind
+    ('template', 'store', 'plans' or 'metadata'), size in bytes and last_used
+    time (None if never recorded), and refreshes the recorded sizes.
+    """
+    usage = _read_usage()
+    entries = []
+    try:
+        names = sorted(os.listdir(cfg.CACHE_DIR))
+    except OSError:
+        names = []
+
+    checkouts = []
+    for name in names:
+        path = os.path.join(cfg.CACHE_DIR, name)
+        if name in GROUP_ENTRIES:
+            entries.append({'key': name, 'path': path, 'kind': GROUP_ENTRIES[name]})
+        elif name in METADATA_ENTRIES:
+            entries.append({'key': name, 'path': path, 'kind': 'metadata'})
+        elif os.path.isdir(path) and not name.startswith('.') and name != LOCKS_DIR.name:
+            _find_checkouts(path, checkouts)
+    for path in sorted(checkouts):
+        entries.append({'key': entry_key(path), 'path': path, 'kind': 'template'})
+
+    for entry in entries:
+        entry['size'] = disk_usage(entry['path'])
+        entry['last_used'] = usage.get(entry['key'], {}).get('last_used')
+
+    with _usage_lock, locked('usage.json'):
+        usage = _read_usage()
+        for entry in entries:
+            if entry['kind'] != 'metadata':
+                usage.setdefault(entry['key'], {})['size'] = entry['size']
+        # Forget entries that no longer exist
+        keys = {entry['key'] for entry in entries}
+        for key in [key for key in usage if key not in keys]:
+            del usage[key]
+        _write_usage(usage)
+    return entries
+
+
+def _remove_readonly(func, path, _):
+    """rmtree error handler for read-only store blobs, which Windows won't delete."""
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
+
+
+def evict(entry):
+    """
+    Deletes a cache entry and forgets its usage. Empty parent directories of
+    checkouts go too. Entries in use by any process are left alone; returns
+    False for those.
+    """
+    path = entry['path']
+    lock = None
+    if entry['kind'] != 'metadata':
+        lock = acquire(path, blocking=False)
+        if lock is None:
+            return False
+    try:
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, onerror=_remove_readonly)
+        elif os.path.lexists(path):
+            os.unlink(path)
+    finally:
+        if lock is not None:
+            lock.close()
+
+    if entry['kind'] == 'template':
+        parent = os.path.dirname(path)
+        while os.path.abspath(parent) != os.path.abspath(cfg.CACHE_DIR):
+            try:
+                os.rmdir(parent)
+            except OSError:
+                break
+            parent = os.path.dirname(parent)
+
+    with _usage_lock, locked('usage.json'):
+        usage = _read_usage()
+        if usage.pop(entry['key'], None) is not None:
+            _write_usage(usage)
+    return True
+
+
+def gc_checkout(path):
+    """Drops everything in a checkout's git repository that its checked-out revision doesn't need."""
+    from .remote import FetchError, _git
+
+    try:
+        _git('reflog', 'expire', '--expire=now', '--all', cwd=path)
+        _git('gc', '--quiet', '--prune=now', cwd=path)
+    except FetchError as e:
+        print(f"Warning: Could not compact {path}: {e}")
+        return False
+    return True
+
+
+def max_bytes():
+    """Returns the `cache_max_bytes` budget in bytes, or None if the cache is unbounded."""
+    budget = cfg.load_config().get('cache_max_bytes', cfg.DEFAULT_CONFIG['cache_max_bytes'])
+    if not budget:
+        return None
+    try:
+        return parse_size(budget)
+    except ValueError:
+        print(f"Warning: Ignoring invalid cache_max_bytes setting {budget!r}")
+        return None
+
+
+def prune(budget=None, keep=(), gc=False):
+    """
+    Evicts least recently used entries until the cache fits in `budget`
+    bytes (the `cache_max_bytes` setting by default). Template checkouts,
+    the template store and render plans are evicted; metadata and the
+    entries at the `keep` paths never are, nor are entries another process
+    is using. Entries whose use was never recorded go first. With `gc`, the
+    checkouts that remain and are not in use are compacted with git gc.
+
+    Returns (evicted entries, bytes freed).
+    """
+    if budget is None:
+        budget = max_bytes()
+    keep = {entry_key(path) for path in keep}
+    entries = list_entries()
+    total = sum(entry['size'] for entry in entries)
+
+    evicted = []
+    freed = 0
+    if budget is not None:
+        candidates = sorted(
+            (entry for entry in entries if entry['kind'] != 'metadata' and entry['key'] not in keep),
+            key=lambda entry: entry['last_used'] or 0,
+        )
+        for entry in candidates:
+            if total <= budget:
+                break
+            if not evict(entry):
+                continue
+            evicted.append(entry)
+            total -= entry['size']
+            freed += entry['size']
+
+    if gc:
+        evicted_keys = {entry['key'] for entry in evicted}
+        sizes = {}
+        for entry in entries:
+            if entry['kind'] != 'template' or entry['key'] in evicted_keys:
+                continue
+            lock = acquire(entry['path'], blocking=False)
+            if lock is None:
+                continue
+            with lock:
+                if gc_checkout(entry['path']):
+                    sizes[entry['key']] = disk_usage(entry['path'])
+                    freed += max(entry['size'] - sizes[entry['key']], 0)
+        if sizes:
+            with _usage_lock, locked('usage.json'):
+                usage = _read_usage()
+                for key, size in sizes.items():
+                    usage.setdefault(key, {})['size'] = size
+                _write_usage(usage)
+    return evicted, freed
+
+
+def enforce_budget(keep=()):
+    """Prunes the cache to the `cache_max_bytes` budget, if one is set, never evicting `keep`."""
+    budget = max_bytes()
+    if budget is None:
+        return [], 0
+    return prune(budget, keep=keep)
+
+
+def clear():
+    """Deletes everything in the cache that is not in use. Returns (bytes freed, entries in use)."""
+    freed = 0
+    in_use = []
+    for entry in list_entries():
+        if evict(entry):
+            freed += entry['size']
+        else:
+            in_use.append(entry)
+    return freed, in_use
+
+
+def parse_size(value):
+    """Parses a byte count such as 1048576, '500M' or '2G'. Raises ValueError."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip().lower().rstrip('b').rstrip('i')
+    number, unit = text, ''
+    if text and text[-1] in SIZE_UNITS:
+        number, unit = text[:-1], text[-1]
+    return int(float(number) * SIZE_UNITS[unit])
+
+
+def format_size(size):
+    """Formats a byte count for people, e.g. '1.5 MB'."""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
@@ -0,0 +1,283 @@
+"""
+A persistent, searchable index of every known template.
+"""
+
+import heapq
+import json
+import os
+import re
+from bisect import bisect_left
+
+from . import config as cfg
+
+CATALOGUE_FILE = cfg.CACHE_DIR / "catalogue.json"
+
+# Bumped whenever the index format or the way it is built changes
+CATALOGUE_VERSION = 1
+
+# How much a query term matching each field counts
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'title': 2.5,
+    'tags': 2.0,
+    'category': 1.5,
+    'description': 1.0,
+}
+
+# Similarity of a term the query term is a prefix of
+PREFIX_SIMILARITY = 0.8
+
+# Fuzzy (trigram) matches below this Jaccard similarity are ignored; above it
+# they count for at most FUZZY_SIMILARITY
+FUZZY_THRESHOLD = 0.25
+FUZZY_SIMILARITY = 0.7
+
+# Added per matched query term, so matching more terms always ranks higher
+MATCH_BONUS = 1000.0
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Splits text into lowercase alphanumeric terms; 'python_client_flask' gives three."""
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def trigrams(term):
+    """Returns the trigrams of a term padded with spaces, so short terms and word edges count too."""
+    padded = f" {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def build_segment(fingerprint, documents):
+    """
+    Indexes the documents of one source.
+
+    Returns a segment: the documents, an inverted index of term -> [[document,
+    weight], ...] keeping each term's best field weight per document, and a
+    trigram -> [term, ...] index for fuzzy matching.
+    """
+    postings = {}
+    for index, document in enumerate(documents):
+        weights = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            value = document.get(field)
+            text = ' '.join(value) if isinstance(value, list) else value
+            for term in tokenize(text):
+                if weight > weights.get(term, 0):
+                    weights[term] = weight
+        for term, weight in weights.items():
+            postings.setdefault(term, []).append([index, weight])
+
+    trigram_index = {}
+    for term in sorted(postings):
+        for trigram in trigrams(term):
+            trigram_index.setdefault(trigram, []).append(term)
+    return {'fingerprint': fingerprint, 'documents': documents, 'postings': postings, 'trigrams': trigram_index}
+
+
+class Catalogue:
+    """A template index made of one segment per source, each rebuilt only when its source changes."""
+
+    def __init__(self, segments=None):
+        self.segments = segments or {}
+        self._sorted_terms = {}
+        self._term_trigrams = {}
+
+    def documents(self, category=None):
+        """Returns every indexed template, or those of one category, sorted by category and name."""
+        documents = [
+            document
+            for segment in self.segments.values()
+            for document in segment['documents']
+            if category is None or document['category'] == category
+        ]
+        return sorted(documents, key=lambda d: (d['category'], d['name'] or ''))
+
+    def _matching_terms(self, name, segment, token):
+        """
+        Returns (term, similarity) pairs for the terms of a segment a query
+        term matches exactly or as a prefix. Only when it matches neither way
+        is it taken for a misspelling and matched fuzzily by trigrams.
+        """
+        postings = segment['postings']
+        matches = [(token, 1.0)] if token in postings else []
+
+        sorted_terms = self._sorted_terms.get(name)
+        if sorted_terms is None:
+            sorted_terms = self._sorted_terms[name] = sorted(postings)
+        for position in range(bisect_left(sorted_terms, token), len(sorted_terms)):
+            term = sorted_terms[position]
+            if not term.startswith(token):
+                break
+            if term != token:
+                matches.append((term, PREFIX_SIMILARITY))
+
+        if matches or len(token) < 3:
+            return matches
+        token_trigrams = trigrams(token)
+        shared = {}
+        for trigram in token_trigrams:
+            for term in segment['trigrams'].get(trigram, ()):
+                shared[term] = shared.get(term, 0) + 1
+        for term, count in shared.items():
+            term_trigrams = self._term_trigrams.get(term)
+            if term_trigrams is None:
+                term_trigrams = self._term_trigrams[term] = len(trigrams(term))
+            similarity = count / (len(token_trigrams) + term_trigrams - count)
+            if similarity >= FUZZY_THRESHOLD:
+                matches.append((term, similarity * FUZZY_SIMILARITY))
+        return matches
+
+    def search(self, query, limit=None):
+        """
+        Returns up to `limit` (score, document) pairs for the templates
+        matching a query, best first. Templates matching more of the query's
+        terms rank first, then by the summed field weight times match
+        similarity of each term.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        results = []
+        for name, segment in self.segments.items():
+            postings = segment['postings']
+            # Document -> MATCH_BONUS per query term matched plus their scores
+            scores = {}
+            for token in tokens:
+                best = {}
+                for term, similarity in self._matching_terms(name, segment, token):
+                    for document, weight in postings[term]:
+                        score = weight * similarity
+                        if score > best.get(document, 0.0):
+                            best[document] = score
+                for document, score in best.items():
+                    scores[document] = scores.get(document, 0.0) + MATCH_BONUS + score
+
+            # Documents are stored by category and name, which breaks ties
+            ranked = [(-score, document) for document, score in scores.items()]
+            ranked = heapq.nsmallest(limit, ranked) if limit is not None else sorted(ranked)
+            documents = segment['documents']
+            results += [
+                (score, documents[index]['category'], documents[index]['name'] or '', documents[index])
+                for score, index in ranked
+            ]
+
+        results.sort(key=lambda r: r[:3])
+        return [(-score % MATCH_BONUS, document) for score, _, _, document in results[:limit]]
+
+
+def _fingerprint(data):
+    import hashlib
+
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _local_documents(templates, templates_dir):
+    """Returns (fingerprint, read) for the local templates; read() loads their documents from template.json."""
+    entries = []
+    for category, template_list in templates.items():
+        for t in template_list:
+            if t.get('source') != 'local':
+                continue
+            path = os.path.join(templates_dir, category, t['name'], 'template.json')
+            try:
+                st = os.stat(path)
+                stamp = [st.st_size, st.st_mtime_ns]
+            except OSError:
+                stamp = None
+            entries.append([category, t['name'], stamp])
+    entries.sort()
+
+    def read():
+        documents = []
+        for category, name, stamp in entries:
+            template_config = {}
+            if stamp is not None:
+                try:
+                    with open(os.path.join(templates_dir, category, name, 'template.json'), 'r', encoding='utf-8') as f:
+                        template_config = json.load(f)
+                except (OSError, ValueError):
+                    pass
+            if not isinstance(template_config, dict):
+                template_config = {}
+            documents.append(_document(category, name, 'local', template_config))
+        return documents
+
+    return _fingerprint(entries), read
+
+
+def _document(category, name, source, info):
+    tags = info.get('tags')
+    return {
+        'category': category,
+        'name': name,
+        'title': info.get('title') or info.get('name') or '',
+        'description': info.get('description') or '',
+        'tags': [str(tag) for tag in tags] if isinstance(tags, list) else [],
+        'source': source,
+    }
+
+
+def _remote_documents(templates, source):
+    """Returns (fingerprint, read) for the templates of a remote source, indexed from their list_templates() entries."""
+    documents = sorted(
+        (_document(category, t['name'], source, t)
+         for category, template_list in templates.items()
+         for t in template_list
+         if t.get('source') == source),
+        key=lambda d: (d['category'], d['name'] or ''),
+    )
+    return _fingerprint(documents), lambda: documents
+
+
+def load_catalogue():
+    """Returns the catalogue saved in CATALOGUE_FILE, or an empty one."""
+    try:
+        with open(CATALOGUE_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == CATALOGUE_VERSION:
+            return Catalogue(data['segments'])
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    return Catalogue()
+
+
+def _save_catalogue(catalogue, warn=print):
+    try:
+        cfg.write_json(CATALOGUE_FILE, {'version': CATALOGUE_VERSION, 'segments': catalogue.segments})
+    except OSError as e:
+        warn(f"Warning: Could not save the template catalogue: {e}")
+
+
+def update_catalogue(templates, templates_dir, warn=print):
+    """
+    Brings the saved catalogue up to date with a list_templates() result.
+
+    Local, public and private templates are indexed as separate segments,
+    each keyed by a fingerprint of its source: the size and mtime of local
+    template.json files, and the entries themselves for remote sources. Only
+    segments whose fingerprint changed are rebuilt, and the catalogue is only
+    written back when one was, passing warnings to `warn`. Returns the
+    Catalogue.
+    """
+    catalogue = load_catalogue()
+    sources = {
+        'local': _local_documents(templates, templates_dir),
+        'public': _remote_documents(templates, 'public'),
+        'private': _remote_documents(templates, 'private'),
+    }
+    changed = set(catalogue.segments) - set(sources)
+    segments = {}
+    for name, (fingerprint, read) in sources.items():
+        segment = catalogue.segments.get(name)
+        if segment is None or segment.get('fingerprint') != fingerprint:
+            segment = build_segment(fingerprint, read())
+            changed.add(name)
+        segments[name] = segment
+
+    catalogue = Catalogue(segments)
+    if changed:
+        _save_catalogue(catalogue, warn)
+    return catalogue
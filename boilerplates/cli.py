@@ -2,17 +2,43 @@
 
 import os
 import sys
-import shutil
 import re
 import argparse
+import contextlib
 import json
-import fnmatch
 from pathlib import Path
-from InquirerPy import prompt
-from InquirerPy.validator import EmptyInputValidator
-import requests
-import subprocess
+from . import cache
 from . import config as cfg
+from . import timings
+from .archive import ARCHIVE_FORMATS, open_sink, render_archive
+from .manifest import (
+    MANIFEST_NAME,
+    config_hash,
+    dump_manifest,
+    keep_merge_bases,
+    load_stored_config,
+    read_manifest,
+    record_outputs,
+    upgrade_project,
+    write_manifest,
+)
+from .plan import LEGACY_TEMPLATE_CONFIG, PLAN_CACHE_DIR, load_plan
+from .registry import RegistryError, fetch_registry
+from .store import OBJECTS_DIR
+from .render import (
+    FILTERS,
+    LINK_MODES,
+    compile_glob,
+    compile_replacements,
+    needs_substitution,
+    render_template,
+    render_text,
+    snake_case,
+)
+
+# Keys every line of a create-batch manifest must have
+BATCH_REQUIRED_FIELDS = ('category', 'template', 'project')
+BATCH_OPTIONAL_FIELDS = ('package', 'output', 'author', 'email', 'description')
 
 def set_github_token():
     """Prompts the user for a GitHub token and saves it."""
@@ -55,12 +81,9 @@ def get_templates_dir():
     return Path(__file__).parent / "templates"
 
 
-def list_templates():
-    """Lists all available templates organized by category."""
-    config = cfg.load_config()
+def _scan_local_templates():
+    """Returns the bundled templates, by category."""
     templates = {}
-
-    # 1. Local templates
     templates_dir = get_templates_dir()
     if templates_dir.exists():
         for category_dir in templates_dir.iterdir():
@@ -71,42 +94,176 @@ def list_templates():
                 for d in category_dir.iterdir():
                     if d.is_dir() and not d.name.startswith('.'):
                         templates[category].append({"name": d.name, "source": "local"})
+    return templates
 
-    # 2. Public templates
-    public_repo_url = config.get("public_repo_url")
-    if public_repo_url:
-        try:
-            response = requests.get(public_repo_url, timeout=10)
-            response.raise_for_status()
-            public_templates = response.json().get("templates", [])
-            for t in public_templates:
-                category = t.get("category", "uncategorized")
-                if category not in templates:
-                    templates[category] = []
-                templates[category].append({
-                    "name": t.get("name"),
-                    "description": t.get("description"),
-                    "url": t.get("url"),
-                    "source": "public"
-                })
-        except requests.exceptions.RequestException as e:
-            print(f"Warning: Could not fetch public templates: {e}")
 
-    # 3. Private templates
-    private_repos = config.get("private_repos", [])
-    for repo in private_repos:
-        category = "private"
+def _fetch_public_templates(public_repo_url, refresh, timeout, warn):
+    """Returns the public registry's templates, by category. Raises RegistryError."""
+    with timings.phase('registry'):
+        registry = fetch_registry(public_repo_url, ttl=0 if refresh else None, timeout=timeout, warn=warn)
+    templates = {}
+    for t in registry.get("templates", []):
+        category = t.get("category", "uncategorized")
         if category not in templates:
             templates[category] = []
+        # Registry entries may point at a subdirectory of a shared
+        # repository (templates-registry.json: repo/path/branch/commit)
         templates[category].append({
-            "name": repo.get("alias"),
-            "url": repo.get("url"),
-            "source": "private"
+            "name": t.get("id") or t.get("name"),
+            "title": t.get("name"),
+            "description": t.get("description"),
+            "tags": t.get("tags") or [],
+            "url": t.get("url") or t.get("repo") or registry.get("default_repo"),
+            "path": t.get("path"),
+            "branch": t.get("branch"),
+            "commit": t.get("commit"),
+            "source": "public"
         })
+    return templates
+
+
+def _private_template(repo, with_metadata=True):
+    """Returns the entry of a private repository, with metadata from its local template.json if `with_metadata`."""
+    template = {
+        "name": repo.get("alias"),
+        "url": repo.get("url"),
+        "source": "private"
+    }
+    if with_metadata and repo.get("url"):
+        from .remote import read_template_config
+        template_config = read_template_config(repo["url"])
+        if isinstance(template_config, dict):
+            for key, field in (("title", "name"), ("description", "description"), ("tags", "tags")):
+                if template_config.get(field):
+                    template[key] = template_config[field]
+    return template
+
+
+@timings.timed('list_templates')
+def list_templates(refresh=False, warn=print):
+    """Lists all available templates organized by category, passing warnings to `warn`."""
+    import queue
+    import threading
+    import time
+
+    config = cfg.load_config()
+    timeout = config.get("discovery_timeout", cfg.DEFAULT_CONFIG["discovery_timeout"])
+    deadline = time.monotonic() + timeout
+    public_repo_url = config.get("public_repo_url")
+    private_repos = config.get("private_repos", [])
+
+    sources = []
+    if public_repo_url:
+        # Served from the local cache while fresh; `refresh` revalidates it
+        sources.append(("public", _fetch_public_templates, (public_repo_url, refresh, timeout, warn)))
+    for index, repo in enumerate(private_repos):
+        sources.append((index, _private_template, (repo,)))
+
+    arrivals = queue.Queue()
+
+    def discover(key, func, args):
+        try:
+            arrivals.put((key, func(*args), None))
+        except Exception as e:
+            arrivals.put((key, None, e))
+
+    # Daemon threads, so a source that hangs never holds up exit
+    for key, func, args in sources:
+        threading.Thread(target=discover, args=(key, func, args), daemon=True).start()
+
+    # 1. Local templates, scanned while the others are on their way
+    templates = _scan_local_templates()
+
+    # Sources that miss the `discovery_timeout` deadline are given up on: the
+    # registry with a warning, private repositories by listing them bare
+    results = {}
+    while len(results) < len(sources):
+        try:
+            key, result, error = arrivals.get(timeout=max(deadline - time.monotonic(), 0))
+        except queue.Empty:
+            break
+        results[key] = (result, error)
+
+    # 2. Public templates
+    if public_repo_url:
+        public_templates, error = results.get("public", (None, None))
+        if error is not None and not isinstance(error, RegistryError):
+            raise error
+        if error is not None:
+            warn(f"Warning: Could not fetch public templates: {error}")
+        elif public_templates is None:
+            warn(f"Warning: Could not fetch public templates: timed out after {timeout}s")
+        for category, template_list in (public_templates or {}).items():
+            templates.setdefault(category, []).extend(template_list)
+
+    # 3. Private templates
+    for index, repo in enumerate(private_repos):
+        template, error = results.get(index, (None, None))
+        if error is not None:
+            raise error
+        if template is None:
+            template = _private_template(repo, with_metadata=False)
+        templates.setdefault("private", []).append(template)
 
     return templates
 
 
+def index_templates(templates, warn=print):
+    """Returns the catalogue.Catalogue of a list_templates() result, updating the saved index where it changed."""
+    from .catalogue import update_catalogue
+
+    with timings.phase('catalogue'):
+        return update_catalogue(templates, get_templates_dir(), warn)
+
+
+def search_templates(query, limit=20):
+    """Prints the templates best matching a search query. Returns False if none match."""
+    results = index_templates(list_templates()).search(query, limit)
+    if not results:
+        print(f"No templates match '{query}'.")
+        return False
+
+    print(f"\nTemplates matching '{query}':")
+    print("=" * 50)
+    for index, (_, template) in enumerate(results, 1):
+        display_text = f"  {index}. {template['category']}/{template['name']} ({template['source']})"
+        if template['description']:
+            display_text += f" - {template['description']}"
+        if template['tags']:
+            display_text += f" [{', '.join(template['tags'])}]"
+        print(display_text)
+    print("=" * 50)
+    return True
+
+
+def prefetch_templates():
+    """Loads the catalogue in the background; returns a waiter giving (templates, catalogue, warnings)."""
+    import threading
+
+    result = {}
+    warnings = []
+
+    def load():
+        try:
+            result['templates'] = list_templates(warn=warnings.append)
+            result['catalogue'] = index_templates(result['templates'], warn=warnings.append)
+        except Exception as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=load, name='template-prefetch', daemon=True)
+    thread.start()
+
+    def wait():
+        if thread.is_alive():
+            print("Loading templates...")
+            thread.join()
+        if 'error' in result:
+            raise result['error']
+        return result['templates'], result['catalogue'], warnings
+
+    return wait
+
+
 def display_templates(templates):
     """Displays available templates in a formatted way."""
     if not templates:
@@ -140,10 +297,7 @@ def display_templates(templates):
 
 def sanitize_package_name(name):
     """Sanitizes a project name to be a valid Python package name (slug with underscores)."""
-    name = re.sub(r'[^a-zA-Z0-9_]', '_', name)
-    name = re.sub(r'^[^a-zA-Z_]+', '', name)
-    name = re.sub(r'_+', '_', name)  # Replace multiple underscores with single
-    return name.lower().strip('_')
+    return snake_case(name)
 
 
 def get_valid_input(prompt, default=None):
@@ -170,21 +324,24 @@ def load_template_config(template_path):
 
 
 def apply_variable_substitution(text, variables):
-    """Replaces {{variable}} placeholders with actual values."""
-    for key, value in variables.items():
-        text = text.replace(f"{{{{{key}}}}}", value)
-    return text
+    """Replaces {{variable}} placeholders, optionally with filters like {{variable | kebab_case}}, with actual values."""
+    return render_text(text, variables)
 
 
 def replace_in_file(filepath, replacements):
-    """Reads a file and applies multiple replacements."""
+    """Reads a file and applies one or more {old: new} replacements in a single pass."""
+    if not isinstance(replacements, (list, tuple)):
+        replacements = [replacements]
+    replacers = [compile_replacements(r) for r in replacements]
     try:
+        if not needs_substitution(filepath, replacers):
+            return False
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
 
         new_content = content
-        for old_str, new_str in replacements.items():
-            new_content = new_content.replace(old_str, new_str)
+        for replacer in replacers:
+            new_content = replacer(new_content)
 
         if content != new_content:
             with open(filepath, 'w', encoding='utf-8') as f:
@@ -236,69 +393,51 @@ def get_template_variables(template_config, project_name, package_name=None, aut
             # Use provided or default value
             value = default
 
-        # Apply format
-        if format_type == 'snake_case':
-            value = sanitize_package_name(value)
+        # Apply format: any filter name, e.g. snake_case or kebab_case
+        if format_type in FILTERS:
+            value = FILTERS[format_type](value)
 
         variables[var_name] = value
 
     return variables
 
 
-def expand_brace_pattern(pattern):
-    """Expands brace patterns like '**/*.{py,md}' into ['**/*.py', '**/*.md']."""
-    import re
-
-    # Find brace expansion pattern {a,b,c}
-    brace_match = re.search(r'\{([^}]+)\}', pattern)
-
-    if not brace_match:
-        # No braces, return as-is
-        return [pattern]
-
-    # Extract the options inside braces
-    options = brace_match.group(1).split(',')
-
-    # Get the part before and after the braces
-    before = pattern[:brace_match.start()]
-    after = pattern[brace_match.end():]
-
-    # Generate all combinations
-    expanded = [f"{before}{opt.strip()}{after}" for opt in options]
-
-    # Recursively expand if there are more braces
-    final_expanded = []
-    for exp in expanded:
-        final_expanded.extend(expand_brace_pattern(exp))
-
-    return final_expanded
-
+def find_template(templates, category, template_name):
+    """Returns the entry of a template in a list_templates() result, or None."""
+    for t in templates.get(category, []):
+        if t['name'] == template_name:
+            return t
+    return None
 
-def matches_any_pattern(file_path, patterns):
-    """Check if file_path matches any of the given glob patterns."""
-    file_str = str(file_path)
-    file_str_posix = file_str.replace('\\', '/')
 
-    for pattern in patterns:
-        if fnmatch.fnmatch(file_str, pattern) or fnmatch.fnmatch(file_str_posix, pattern):
-            return True
-    return False
+def describe_template(category, template_info, template_config):
+    """Returns what a project manifest records about the template it came from."""
+    template = {
+        'category': category,
+        'name': template_info['name'],
+        'id': (template_config or {}).get('id'),
+        'source': template_info['source'],
+    }
+    if template_info['source'] != 'local':
+        from .remote import head_commit, template_cache_path
+        checkout = template_cache_path(template_info['url'], template_info.get('path'))
+        template.update(
+            url=template_info['url'],
+            path=template_info.get('path'),
+            branch=template_info.get('branch'),
+            commit=head_commit(checkout),
+        )
+    return template
 
 
-def get_template_path(category, template_name):
-    """
-    Gets the local path to a template, fetching it from a remote source if necessary.
-    """
+@timings.timed('get_template_path')
+def get_template_path(category, template_name, templates=None):
+    """Gets the local path to a template, fetching it from a remote source if necessary."""
     config = cfg.load_config()
-    all_templates = list_templates()
-
-    template_info = None
-    if category in all_templates:
-        for t in all_templates[category]:
-            if t['name'] == template_name:
-                template_info = t
-                break
+    # Callers resolving several templates pass one listing for all of them
+    all_templates = templates if templates is not None else list_templates()
 
+    template_info = find_template(all_templates, category, template_name)
     if not template_info:
         return None
 
@@ -310,114 +449,299 @@ def get_template_path(category, template_name):
     if not url:
         return None
 
-    # Construct cache path
-    url_parts = url.replace('https://', '').replace('.git', '')
-    cache_path = cfg.CACHE_DIR / url_parts
-    
-    # Clone or pull
+    from .remote import needs_update, template_cache_path, template_dir
+
+    token = config.get('github_token') if template_info['source'] == 'private' else None
+    cache_path = template_cache_path(url, template_info.get('path'))
+    path = template_dir(cache_path, template_info.get('path'))
+    max_age = config.get('template_refresh_interval', cfg.DEFAULT_CONFIG['template_refresh_interval'])
+
+    # Already in use by this process, so it is current; updating it now would
+    # change it under projects being rendered from it
+    if cache.is_held(cache_path):
+        return path
+
+    def current():
+        return cache_path.exists() and not needs_update(cache_path, template_info.get('commit'), max_age)
+
+    # A shared lock keeps other processes from updating or evicting the
+    # checkout while it is in use; it is held until exit. Where locks can't
+    # be shared, a taken one is done without (see cache.acquire())
+    lock = cache.acquire(cache_path, shared=True)
+    fetched = False
+    if not current():
+        if lock is not None:
+            lock.close()
+        lock = None
+        # Shallow, sparse fetch of just this template at its pinned revision.
+        # One invocation fetches while concurrent ones wait, then find the
+        # checkout current.
+        with cache.fetching(cache_path):
+            if not current():
+                # Others only hold a missing checkout's lock for a moment; an
+                # existing one is only updated when nobody is using it
+                lock = cache.acquire(cache_path, blocking=not cache_path.exists())
+                if lock is not None:
+                    try:
+                        fetched = _fetch_checkout(template_name, template_info, cache_path, token, max_age)
+                    except BaseException:
+                        lock.close()
+                        raise
+                    cache.relock(lock, shared=True)
+                else:
+                    print(f"Template '{template_name}' is in use by another process; using the cached copy.")
+            if lock is None:
+                lock = cache.acquire(cache_path, shared=True)
+    if fetched is None:
+        if lock is not None:
+            lock.close()
+        return None
+    cache.hold(cache_path, lock)
+    cache.touch(cache_path)
+
+    if fetched:
+        # The cache grew: make room under cache_max_bytes, least recently used first
+        with timings.phase('cache eviction'):
+            evicted, _ = cache.enforce_budget(keep=[cache_path])
+        for entry in evicted:
+            print(f"Evicted '{entry['key']}' ({cache.format_size(entry['size'])}) from the template cache.")
+    return path
+
+
+def _fetch_checkout(template_name, template_info, cache_path, token, max_age):
+    """Clones or updates a checkout under its exclusive lock; returns True if fetched, None if there is no checkout."""
+    from .remote import FetchError, fetch_template, needs_update
+
+    url = template_info['url']
     if cache_path.exists():
+        if not needs_update(cache_path, template_info.get('commit'), max_age):
+            return False
         print(f"Updating template '{template_name}' from {url}...")
-        try:
-            subprocess.run(['git', '-C', str(cache_path), 'pull'], check=True, capture_output=True)
-        except subprocess.CalledProcessError as e:
-            print(f"Warning: Could not update template: {e.stderr.decode()}")
     else:
         print(f"Downloading template '{template_name}' from {url}...")
-        token = config.get('github_token')
-        auth_url = url
-        if template_info['source'] == 'private' and token:
-            auth_url = url.replace('https://', f'https://{token}@')
 
-        try:
-            subprocess.run(['git', 'clone', auth_url, str(cache_path)], check=True, capture_output=True)
-        except subprocess.CalledProcessError as e:
-            print(f"Error: Could not clone template: {e.stderr.decode()}")
+    try:
+        with timings.phase('git fetch'):
+            fetch_template(
+                url,
+                subpath=template_info.get('path'),
+                branch=template_info.get('branch'),
+                commit=template_info.get('commit'),
+                token=token,
+                max_age=max_age,
+            )
+    except FetchError as e:
+        if not cache_path.exists():
+            print(f"Error: Could not clone template: {e}")
             return None
-            
-    return cache_path
-
-
-def apply_template_config(target_dir, template_config, variables):
-    """Applies template configuration (renames and replacements)."""
-    if not template_config:
-        return 0
-
-    # Apply rename rules
-    if 'rename' in template_config:
-        for old_name, new_name_template in template_config['rename'].items():
-            new_name = apply_variable_substitution(new_name_template, variables)
-            old_path = target_dir / old_name
-            new_path = target_dir / new_name
+        print(f"Warning: Could not update template: {e}")
+        return False
+    return True
 
-            if old_path.exists() and old_name != new_name:
-                os.rename(old_path, new_path)
-                print(f"Renamed '{old_name}' to '{new_name}'")
 
-    # Apply replace rules
-    files_updated = 0
-    if 'replace' in template_config:
-        for replace_rule in template_config['replace']:
-            glob_pattern = replace_rule.get('glob', '**/*')
+def sync_templates(jobs=4):
+    """Fetches or updates every registered remote template on `jobs` workers; returns True if all synced."""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from .remote import FetchError, fetch_template, needs_update, template_cache_path
 
-            # Expand brace patterns like **/*.{py,md} into multiple patterns
-            expanded_patterns = expand_brace_pattern(glob_pattern)
+    config = cfg.load_config()
+    token = config.get('github_token')
+
+    # One job per cache checkout, even if several entries share it
+    remote_templates = {}
+    for category, template_list in list_templates(refresh=True).items():
+        for t in template_list:
+            if t['source'] != 'local' and t.get('url'):
+                checkout = template_cache_path(t['url'], t.get('path'))
+                remote_templates.setdefault(checkout, (category, t))
+
+    if not remote_templates:
+        print("No remote templates registered.")
+        return True
+
+    def sync_one(checkout, t):
+        with cache.fetching(checkout):
+            if checkout.exists() and not needs_update(checkout, t.get('commit')):
+                return 'up to date'
+            status = 'updated' if checkout.exists() else 'downloaded'
+            # Checkouts other processes are using are left for later
+            lock = cache.acquire(checkout, blocking=not checkout.exists())
+            if lock is None:
+                return 'in use'
+            with lock:
+                fetch_template(
+                    t['url'],
+                    subpath=t.get('path'),
+                    branch=t.get('branch'),
+                    commit=t.get('commit'),
+                    token=token if t['source'] == 'private' else None,
+                )
+        cache.touch(checkout)
+        return status
+
+    total = len(remote_templates)
+    print(f"Syncing {total} remote templates with {jobs} workers...")
+    counts = {}
+    failures = []
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(sync_one, checkout, t): (category, t)
+            for checkout, (category, t) in remote_templates.items()
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            category, t = futures[future]
+            try:
+                status = future.result()
+            except FetchError as e:
+                status = 'failed'
+                failures.append(f"{category}/{t['name']}: {e}")
+            counts[status] = counts.get(status, 0) + 1
+            print(f"  [{done}/{total}] {category}/{t['name']} ({t['source']}): {status}")
+
+    summary = ', '.join(f"{counts[s]} {s}" for s in ('downloaded', 'updated', 'up to date', 'in use', 'failed') if s in counts)
+    print(f"\nSynced {total} templates: {summary}.")
+    for failure in failures:
+        print(f"Error: {failure}")
+    return not failures
+
+
+def resolve_renames(template_config, variables):
+    """Returns the template's rename rules as ordered (old, new) pairs with variables applied."""
+    return [
+        (old_name, apply_variable_substitution(new_name_template, variables))
+        for old_name, new_name_template in template_config.get('rename', {}).items()
+    ]
 
-            replacements = {}
 
-            # Build replacement dictionary
-            for old_template, new_template in replace_rule.get('values', {}).items():
-                old_str = apply_variable_substitution(old_template, variables)
-                new_str = apply_variable_substitution(new_template, variables)
-                replacements[old_str] = new_str
+def build_replace_rules(template_config, variables):
+    """Compiles the 'replace' rules of a template into (matcher, replacer) pairs."""
+    rules = []
+    for replace_rule in template_config.get('replace', []):
+        # Brace patterns like **/*.{py,md} are expanded and merged into one regex
+        matcher = compile_glob(replace_rule.get('glob', '**/*'))
 
-            # Apply to matching files
-            for root, dirs, files in os.walk(target_dir):
-                # Skip certain directories
-                dirs[:] = [d for d in dirs if d not in ['__pycache__', '.git', 'node_modules', '.venv', 'venv']]
+        replacements = {}
 
-                for file in files:
-                    # Skip binary files
-                    if file.endswith(('.pyc', '.png', '.jpg', '.gif', '.ico', '.woff', '.woff2', '.ttf')):
-                        continue
+        # Build replacement dictionary
+        for old_template, new_template in replace_rule.get('values', {}).items():
+            old_str = apply_variable_substitution(old_template, variables)
+            new_str = apply_variable_substitution(new_template, variables)
+            replacements[old_str] = new_str
 
-                    file_path = Path(root) / file
-                    relative_path = file_path.relative_to(target_dir)
+        rules.append((matcher, compile_replacements(replacements)))
+    return rules
 
-                    # Check if file matches any of the expanded patterns
-                    if matches_any_pattern(relative_path, expanded_patterns):
-                        if replace_in_file(file_path, replacements):
-                            files_updated += 1
 
-    return files_updated
+def resolve_link_mode(link_mode=None):
+    """Returns a valid link mode, defaulting to the `link_mode` setting."""
+    if link_mode is None:
+        link_mode = cfg.load_config().get('link_mode') or 'copy'
+    if link_mode not in LINK_MODES:
+        print(f"Warning: Unknown link mode '{link_mode}', copying files instead.")
+        link_mode = 'copy'
+    return link_mode
 
 
-def create_project(category, template_name, project_name, package_name=None, output_dir=None, author_name='', author_email='', project_description=''):
-    """Creates a new project from a template."""
-    template_path = get_template_path(category, template_name)
+@timings.timed('prepare_template')
+def prepare_template(category, template_name, templates=None):
+    """Locates and loads a template; returns (template_path, template_config, plan, description) or None."""
+    if templates is None:
+        templates = list_templates()
+    template_path = get_template_path(category, template_name, templates)
 
     if not template_path or not template_path.exists():
         print(f"Error: Template '{category}/{template_name}' not found.")
-        return False
-        
+        return None
+
     # Load template configuration
-    template_config = load_template_config(template_path)
+    with timings.phase('template.json'):
+        template_config = load_template_config(template_path)
+
+    # The plan is cached per template version, so files no rule changes are
+    # known up front and copied without being read
+    try:
+        with timings.phase('load_plan') as counts:
+            plan = load_plan(template_path, template_config)
+            counts['files'] = len(plan.files)
+    except OSError as e:
+        print(f"Error reading template '{category}/{template_name}': {e}")
+        return None
+
+    # Projects use the plan and the template store; keep them from eviction,
+    # by this process's shared locks while it runs and by recency afterwards
+    for path in (PLAN_CACHE_DIR, OBJECTS_DIR):
+        if not cache.is_held(path):
+            cache.hold(path, cache.acquire(path, shared=True))
+    cache.touch(PLAN_CACHE_DIR, OBJECTS_DIR)
+
+    description = describe_template(category, find_template(templates, category, template_name), template_config)
+    return template_path, template_config, plan, description
+
+
+@timings.timed('write_project_archive')
+def write_project_archive(fileobj, archive_format, project_slug, template, renames, rules, variables):
+    """Renders a project and its manifest into a zip or tar.gz stream; returns the number of changed files."""
+    template_path, template_config, plan, description = template
+    directories, files = plan.resolve(renames, rules)
+    sink = open_sink(archive_format, fileobj)
+    outputs = {}
+    with timings.phase('render_archive') as counts:
+        count = render_archive(sink, project_slug, template_path, directories, files, outputs)
+        counts['files'] = len(files)
+        if timings.enabled():
+            counts['bytes'] = sum(os.path.getsize(source) for source, _, _ in files)
+    try:
+        manifest_files = record_outputs(template_path, outputs)
+        manifest = dump_manifest(description, variables, template_config, manifest_files)
+        sink.add_bytes(f"{project_slug}/{MANIFEST_NAME}", manifest.encode('utf-8'))
+    except OSError as e:
+        print(f"Warning: Could not write {MANIFEST_NAME}: {e}")
+    sink.close()
+    return count
+
+
+@timings.timed('generate_project')
+def generate_project(template, template_label, project_name, package_name=None, output_dir=None, author_name='', author_email='', project_description='', jobs=1, link_mode='copy', verbose=True, archive_format=None):
+    """Generates one project from a template prepared by prepare_template(); returns True on success."""
+    template_path, template_config, plan, description = template
+    log = print if verbose else (lambda *args: None)
 
     # Slugify project name
     project_slug = sanitize_package_name(project_name)
 
-    # Determine output directory - default to ./output/
-    if output_dir:
-        base_output_dir = Path(output_dir)
+    # Archives go to a binary file object, an archive path, or
+    # <project>.<ext> in an output directory
+    archive_stream = None
+    if archive_format and hasattr(output_dir, 'write'):
+        archive_stream = output_dir
+        target_dir = '<stream>'
+    elif archive_format and output_dir and not os.path.isdir(output_dir):
+        target_dir = Path(output_dir)
     else:
-        base_output_dir = Path.cwd() / "output"
+        # Determine output directory - default to ./output/
+        if output_dir:
+            base_output_dir = Path(output_dir)
+        else:
+            base_output_dir = Path.cwd() / "output"
 
-    # Create output directory if it doesn't exist
-    base_output_dir.mkdir(exist_ok=True)
+        # Create output directory if it doesn't exist
+        base_output_dir.mkdir(exist_ok=True)
 
-    target_dir = base_output_dir / project_slug
+        target_dir = base_output_dir / project_slug
+        if archive_format:
+            target_dir = base_output_dir / (project_slug + ARCHIVE_FORMATS[archive_format])
 
-    if target_dir.exists():
-        print(f"Error: Directory '{target_dir}' already exists.")
+    # Claim the target atomically, so concurrent runs can't share it
+    try:
+        if archive_stream is None and archive_format:
+            archive_stream = open(target_dir, 'xb')
+        elif not archive_format:
+            target_dir.mkdir()
+    except FileExistsError:
+        print(f"Error: {'File' if archive_format else 'Directory'} '{target_dir}' already exists.")
+        return False
+    except OSError as e:
+        print(f"Error: Could not create '{target_dir}': {e}")
         return False
 
     # Get template variables
@@ -430,62 +754,297 @@ def create_project(category, template_name, project_name, package_name=None, out
         project_description
     )
 
-    print(f"\nInitializing project '{project_name}' from '{category}/{template_name}'...")
+    log(f"\nInitializing project '{project_name}' from '{template_label}'...")
     if 'package_name' in variables:
-        print(f"Package name: {variables['package_name']}")
-    print(f"Target directory: {target_dir}")
+        log(f"Package name: {variables['package_name']}")
+    log(f"Target {'archive' if archive_format else 'directory'}: {target_dir}")
 
-    # Copy template
+    # Apply template configuration or fallback to legacy behavior
+    if template_config:
+        log("Applying template configuration...")
+    else:
+        # Legacy fallback: rename 'myproject' and do simple replacement
+        log("Using legacy template mode...")
+    with timings.phase('compile rules'):
+        renames = resolve_renames(template_config or LEGACY_TEMPLATE_CONFIG, variables)
+        rules = build_replace_rules(template_config or LEGACY_TEMPLATE_CONFIG, variables)
+
+    for old_name, new_name in renames:
+        if old_name != new_name and (template_path / old_name).exists():
+            log(f"Renamed '{old_name}' to '{new_name}'")
+
+    if archive_format:
+        # Stream every file straight into the archive; nothing touches the disk
+        try:
+            count = write_project_archive(archive_stream, archive_format, project_slug, template, renames, rules, variables)
+        except Exception as e:
+            print(f"Error writing archive: {e}")
+            if archive_stream is not output_dir:
+                archive_stream.close()
+                os.unlink(target_dir)
+            return False
+        if archive_stream is not output_dir:
+            archive_stream.close()
+        else:
+            archive_stream.flush()
+
+        log(f"Updated {count} files.")
+        log(f"\nSuccess! Project '{project_name}' written to {target_dir}")
+        return True
+
+    # Render template: read each file once, write it once to its final path
+    outputs = {}
     try:
-        shutil.copytree(template_path, target_dir, ignore=shutil.ignore_patterns('template.json', '.git'))
+        count = render_template(template_path, target_dir, renames, rules, jobs=jobs, link_mode=link_mode, plan=plan, outputs=outputs)
     except Exception as e:
         print(f"Error copying template: {e}")
         return False
 
-    # Apply template configuration or fallback to legacy behavior
-    if template_config:
-        print("Applying template configuration...")
-        count = apply_template_config(target_dir, template_config, variables)
-        print(f"Updated {count} files.")
-    else:
-        # Legacy fallback: rename 'myproject' and do simple replacement
-        print("Using legacy template mode...")
-        old_pkg_name = 'myproject'
-        package_name = variables.get('package_name', sanitize_package_name(project_name))
+    log(f"Updated {count} files.")
 
-        old_pkg_path = target_dir / old_pkg_name
-        new_pkg_path = target_dir / package_name
+    # Record where the project came from, so 'boilerplates update' can upgrade it
+    try:
+        with timings.phase('manifest') as counts:
+            files = record_outputs(template_path, outputs)
+            write_manifest(target_dir, description, variables, template_config, files)
+            keep_merge_bases(template_path, template_config, files)
+            counts['files'] = len(files)
+    except OSError as e:
+        print(f"Warning: Could not write {MANIFEST_NAME}: {e}")
+
+    log(f"\nSuccess! Project '{project_name}' created at {target_dir}")
+    log(f"\nNext steps:")
+    log(f"  cd output/{project_slug}")
+    log("  # Follow the README.md instructions inside the project")
 
-        if old_pkg_path.exists():
-            os.rename(old_pkg_path, new_pkg_path)
-            print(f"Renamed package directory '{old_pkg_name}' to '{package_name}'")
+    return True
 
-        # Find and replace in files
-        print("Updating file contents...")
-        count = 0
-        replacements = {old_pkg_name: package_name}
 
-        for root, dirs, files in os.walk(target_dir):
-            dirs[:] = [d for d in dirs if d not in ['__pycache__', '.git', 'node_modules', '.venv', 'venv']]
+def create_project(category, template_name, project_name, package_name=None, output_dir=None, author_name='', author_email='', project_description='', jobs=1, link_mode=None, archive_format=None, templates=None):
+    """Creates a new project from a template, rendering files on `jobs` worker threads."""
+    link_mode = resolve_link_mode(link_mode)
+    template = prepare_template(category, template_name, templates)
+    if template is None:
+        return False
+    return generate_project(
+        template,
+        f"{category}/{template_name}",
+        project_name,
+        package_name,
+        output_dir,
+        author_name,
+        author_email,
+        project_description,
+        jobs=jobs,
+        link_mode=link_mode,
+        archive_format=archive_format
+    )
 
-            for file in files:
-                if file.endswith(('.pyc', '.png', '.jpg', '.gif', '.ico', '.woff', '.woff2', '.ttf')):
-                    continue
 
-                file_path = Path(root) / file
-                if replace_in_file(file_path, replacements):
-                    count += 1
+@timings.timed('update_project')
+def update_project(project_dir='.'):
+    """Upgrades a generated project to the current version of its template; returns False on failure or conflicts."""
+    target_dir = Path(project_dir)
+    try:
+        manifest = read_manifest(target_dir)
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not read {MANIFEST_NAME} in '{target_dir}': {e}")
+        return False
 
-        print(f"Updated {count} files.")
+    category = manifest['template'].get('category')
+    template_name = manifest['template'].get('name')
+    template = prepare_template(category, template_name)
+    if template is None:
+        return False
+    template_path, template_config, plan, description = template
+
+    print(f"Updating '{target_dir}' from '{category}/{template_name}'...")
+    variables = manifest.get('variables', {})
+    effective_config = template_config or LEGACY_TEMPLATE_CONFIG
+    renames = resolve_renames(effective_config, variables)
+    rules = build_replace_rules(effective_config, variables)
+    directories, files = plan.resolve(renames, rules)
+
+    # Locally modified files are merged against what they were rendered as,
+    # which is rebuilt with the rules of the configuration used back then
+    config_changed = manifest.get('config_hash') != config_hash(template_config)
+    base_rules = rules
+    if config_changed:
+        base_config = load_stored_config(manifest.get('config_hash'))
+        base_rules = build_replace_rules(base_config, variables) if base_config is not None else None
+
+    # Only files whose template source changed are re-rendered; unmodified
+    # ones are replaced and locally modified ones three-way merged
+    try:
+        with timings.phase('upgrade_project') as phase_counts:
+            new_files, results = upgrade_project(
+                target_dir,
+                manifest['files'],
+                directories,
+                files,
+                template_path,
+                rerender_all=config_changed,
+                base_rules=base_rules,
+            )
+            phase_counts['files'] = len(files)
+        write_manifest(target_dir, description, variables, template_config, new_files)
+        keep_merge_bases(template_path, template_config, new_files)
+    except OSError as e:
+        print(f"Error updating project: {e}")
+        return False
+
+    counts = {}
+    for status, destination in results:
+        counts[status] = counts.get(status, 0) + 1
+        print(f"  {status}: {destination}")
+    if not results:
+        print("Project is up to date.")
+        return True
+
+    print("\nUpdated project: " + ', '.join(f"{n} {status}" for status, n in counts.items()) + ".")
+    if 'conflict' in counts:
+        print("Resolve the conflict markers in the files listed above.")
+        return False
+    return True
 
-    print(f"\nSuccess! Project '{project_name}' created at {target_dir}")
-    print(f"\nNext steps:")
-    print(f"  cd output/{project_slug}")
-    print("  # Follow the README.md instructions inside the project")
 
+def read_batch_manifest(manifest_path):
+    """Parses a JSON Lines manifest with one project spec per line. Raises ValueError naming the bad line."""
+    specs = []
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                spec = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"line {line_number}: {e}") from e
+            if not isinstance(spec, dict):
+                raise ValueError(f"line {line_number}: expected a JSON object")
+            missing = [key for key in BATCH_REQUIRED_FIELDS if not spec.get(key)]
+            if missing:
+                raise ValueError(f"line {line_number}: missing {', '.join(missing)}")
+            invalid = [
+                key for key in BATCH_REQUIRED_FIELDS + BATCH_OPTIONAL_FIELDS
+                if key in spec and not isinstance(spec[key], str)
+            ]
+            if invalid:
+                raise ValueError(f"line {line_number}: {', '.join(invalid)} must be a string")
+            specs.append(spec)
+    return specs
+
+
+def create_batch(manifest_path, jobs=1, link_mode=None):
+    """Creates every project listed in a JSON Lines manifest in one process; returns True if all were created."""
+    try:
+        specs = read_batch_manifest(manifest_path)
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not read manifest '{manifest_path}': {e}")
+        return False
+
+    if not specs:
+        print("No projects in manifest.")
+        return True
+
+    link_mode = resolve_link_mode(link_mode)
+    # Templates are listed once, and each is fetched and planned once for all its projects
+    all_templates = list_templates()
+    prepared = {}
+    for spec in specs:
+        key = (spec['category'], spec['template'])
+        if key not in prepared:
+            prepared[key] = prepare_template(*key, templates=all_templates)
+
+    def create_one(spec):
+        template = prepared[(spec['category'], spec['template'])]
+        if template is None:
+            return False
+        return generate_project(
+            template,
+            f"{spec['category']}/{spec['template']}",
+            spec['project'],
+            spec.get('package'),
+            spec.get('output'),
+            spec.get('author', ''),
+            spec.get('email', ''),
+            spec.get('description', ''),
+            link_mode=link_mode,
+            verbose=False
+        )
+
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    total = len(specs)
+    print(f"Creating {total} projects with {jobs} workers...")
+    failed = 0
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(create_one, spec): spec for spec in specs}
+        for done, future in enumerate(as_completed(futures), 1):
+            spec = futures[future]
+            try:
+                created = future.result()
+            except Exception as e:
+                # One bad spec only fails its own project
+                print(f"Error: {spec['project']}: {e}")
+                created = False
+            if not created:
+                failed += 1
+            status = 'created' if created else 'failed'
+            print(f"  [{done}/{total}] {spec['project']} ({spec['category']}/{spec['template']}): {status}")
+
+    print(f"\nCreated {total - failed} of {total} projects.")
+    return not failed
+
+
+def show_cache_stats():
+    """Prints the size and last use of every cache entry, least recently used first."""
+    import time
+
+    entries = cache.list_entries()
+    if not entries:
+        print("The template cache is empty.")
+        return
+
+    print(f"\nTemplate cache: {cfg.CACHE_DIR}")
+    print("=" * 50)
+    print(f"  {'Entry':<48} {'Kind':<9} {'Size':>10}  Last used")
+    for entry in sorted(entries, key=lambda e: (e['kind'] == 'metadata', e['last_used'] or 0)):
+        last_used = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['last_used'])) if entry['last_used'] else '-'
+        print(f"  {entry['key']:<48} {entry['kind']:<9} {cache.format_size(entry['size']):>10}  {last_used}")
+    print("=" * 50)
+    total = sum(entry['size'] for entry in entries)
+    budget = cache.max_bytes()
+    limit = f" of {cache.format_size(budget)} (cache_max_bytes)" if budget else ", no limit set"
+    print(f"Total: {cache.format_size(total)}{limit}")
+
+
+def prune_cache(max_bytes=None, gc=True):
+    """Evicts least recently used cache entries down to `max_bytes` and compacts the remaining clones."""
+    budget = None
+    if max_bytes is not None:
+        try:
+            budget = cache.parse_size(max_bytes)
+        except ValueError:
+            print(f"Error: Invalid size '{max_bytes}'.")
+            return False
+
+    evicted, freed = cache.prune(budget, gc=gc)
+    for entry in evicted:
+        print(f"Evicted '{entry['key']}' ({cache.format_size(entry['size'])})")
+    total = sum(entry['size'] for entry in cache.list_entries())
+    print(f"Freed {cache.format_size(freed)}; the cache now uses {cache.format_size(total)}.")
     return True
 
 
+def clear_cache():
+    """Deletes the whole template cache; it is rebuilt on demand."""
+    freed, in_use = cache.clear()
+    print(f"Cleared the template cache ({cache.format_size(freed)}).")
+    for entry in in_use:
+        print(f"Kept '{entry['key']}': in use by another process.")
+
+
 def get_template_info(template_path):
     """Get template name and description from template.json if available."""
     config = load_template_config(template_path)
@@ -500,6 +1059,23 @@ def get_template_info(template_path):
     }
 
 
+def write_timings(show, json_path, command):
+    """Prints the per-phase timings to stderr and/or writes them as a JSON report."""
+    data = timings.report()
+    if show:
+        print("\nTimings:", file=sys.stderr)
+        print(timings.format_report(data), file=sys.stderr)
+    if json_path:
+        from . import __version__
+        data = dict(command=command, version=__version__, python=sys.version.split()[0], **data)
+        try:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+                f.write('\n')
+        except OSError as e:
+            print(f"Warning: Could not write timings to '{json_path}': {e}", file=sys.stderr)
+
+
 def print_banner():
     """Prints the CLI banner with version."""
     try:
@@ -523,14 +1099,14 @@ def print_banner():
     print(f"   \033[1m⚡ CLI v{version}\033[0m\n")
 
 
-def interactive_mode():
-    """Runs the CLI in interactive mode with InquirerPy."""
-
-    templates_by_category = list_templates()
+def interactive_mode(prefetch=None):
+    """Runs the CLI in interactive mode with InquirerPy, awaiting the `prefetch` waiter only when needed."""
+    if prefetch is None:
+        prefetch = prefetch_templates()
 
-    if not templates_by_category:
-        print("No templates found.")
-        return
+    # Imported here: the prompt toolkit is only needed when prompting
+    from InquirerPy import prompt
+    from InquirerPy.validator import EmptyInputValidator
 
     # Build questions
     questions = [
@@ -552,6 +1128,25 @@ def interactive_mode():
             'message': 'Author email (optional):',
             'default': '',
         },
+    ]
+
+    # Get initial answers while the catalogue loads
+    answers = prompt(questions)
+
+    # If user cancelled
+    if not answers:
+        print("\nCancelled.")
+        return
+
+    templates_by_category, catalogue, warnings = prefetch()
+    for warning in warnings:
+        print(warning)
+
+    if not templates_by_category:
+        print("No templates found.")
+        return
+
+    category_question = [
         {
             'type': 'list',
             'name': 'category',
@@ -560,25 +1155,28 @@ def interactive_mode():
                 {'name': category.upper(), 'value': category}
                 for category in sorted(templates_by_category.keys())
             ],
-        },
+        }
     ]
+    category_answer = prompt(category_question)
 
-    # Get initial answers
-    answers = prompt(questions)
-
-    # If user cancelled
-    if not answers:
+    if not category_answer:
         print("\nCancelled.")
         return
+    answers.update(category_answer)
 
     # Now ask for template based on selected category
     selected_category = answers['category']
+    # Descriptions and tags from the catalogue are part of each choice, so
+    # the fuzzy search matches them as well as names
+    templates = catalogue.documents(selected_category)
     template_choices = [
         {
-            "name": f"{t['name']} ({t.get('source', 'local')})" + (f" - {t['description']}" if t.get('description') else ""),
+            "name": f"{t['name']} ({t['source']})"
+                    + (f" - {t['description']}" if t['description'] else "")
+                    + (f" [{', '.join(t['tags'])}]" if t['tags'] else ""),
             "value": t['name']
         }
-        for t in templates_by_category[selected_category]
+        for t in templates
     ]
 
     template_question = [
@@ -600,8 +1198,8 @@ def interactive_mode():
     selected_template = template_answer['template']
     
     # Find full template info again
-    template_info = next((t for t in templates_by_category[selected_category] if t['name'] == selected_template), None)
-    description = template_info.get('description', '') if template_info else ''
+    template_info = next((t for t in templates if t['name'] == selected_template), None)
+    description = template_info['description'] if template_info else ''
 
 
     # Ask for project description (optional)
@@ -627,7 +1225,8 @@ def interactive_mode():
         package_name=project_slug,  # Use slugified project name
         author_name=answers['author_name'],
         author_email=answers['author_email'],
-        project_description=project_description
+        project_description=project_description,
+        templates=templates_by_category
     )
 
     if success:
@@ -653,18 +1252,51 @@ Examples:
   boilerplates init                            # Interactive mode with prompts
   boilerplates                                 # Same as 'init'
   boilerplates list                            # List all templates
+  boilerplates search react dashbord           # Fuzzy search names, tags, descriptions
   boilerplates create python flask my-app      # Create from template
   boilerplates create react spa my-spa --package myapp
+  boilerplates sync --jobs 8                   # Prefetch all remote templates
+  boilerplates cache stats                     # Cache size per template, last used
+  boilerplates cache prune --max-bytes 500M    # Evict least recently used entries
+  boilerplates create python flask my-app --link hardlink
+  boilerplates create-batch jobs.jsonl -j 8    # One project per manifest line
+  boilerplates update output/my-app            # Pull template changes into a project
+  boilerplates create react spa my-spa --format zip -o - > my-spa.zip
+  boilerplates create python flask my-app --timings --timings-json t.json
         """
     )
 
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
 
+    # Options shared by the commands that generate files
+    timing_options = argparse.ArgumentParser(add_help=False)
+    timing_options.add_argument('--timings', action='store_true', help='Print time, files and bytes per phase to stderr')
+    timing_options.add_argument('--timings-json', metavar='FILE', help='Write per-phase timings as a JSON report to FILE')
+
     # Init command (interactive mode)
     init_parser = subparsers.add_parser('init', help='Initialize a new project (interactive mode)')
 
     # List command
     list_parser = subparsers.add_parser('list', help='List all available templates')
+    list_parser.add_argument('--refresh', action='store_true', help='Revalidate the cached public registry')
+
+    # Search command
+    search_parser = subparsers.add_parser('search', help='Search templates by name, tags and description')
+    search_parser.add_argument('query', nargs='+', help='Search terms; close spellings match too')
+    search_parser.add_argument('--limit', '-n', type=int, default=20, help='Maximum number of results (default: 20)')
+
+    # Sync command
+    sync_parser = subparsers.add_parser('sync', help='Fetch or update all registered remote templates')
+    sync_parser.add_argument('--jobs', '-j', type=int, default=4, help='Number of templates to fetch concurrently (default: 4)')
+
+    # Cache command
+    cache_parser = subparsers.add_parser('cache', help='Inspect and trim the template cache')
+    cache_subparsers = cache_parser.add_subparsers(dest='cache_command', help='Cache commands')
+    cache_subparsers.add_parser('stats', help='Show the size and last use of every cache entry')
+    prune_parser = cache_subparsers.add_parser('prune', help='Evict least recently used entries and compact clones')
+    prune_parser.add_argument('--max-bytes', help='Size to prune down to, e.g. 500M (default: the cache_max_bytes setting)')
+    prune_parser.add_argument('--no-gc', dest='gc', action='store_false', help='Skip compacting the remaining clones with git gc')
+    cache_subparsers.add_parser('clear', help='Delete everything in the cache')
 
     # Config command
     config_parser = subparsers.add_parser('config', help='Manage configuration')
@@ -681,25 +1313,69 @@ Examples:
     remove_repo_parser.add_argument('alias', help='Alias of the repository to remove')
 
     # Create command
-    create_parser = subparsers.add_parser('create', help='Create a new project from a template')
+    create_parser = subparsers.add_parser('create', parents=[timing_options], help='Create a new project from a template')
     create_parser.add_argument('category', help='Template category (e.g., python, react)')
     create_parser.add_argument('template', help='Template name')
     create_parser.add_argument('project', help='Project name')
     create_parser.add_argument('--package', '-p', help='Package name (defaults to sanitized project name)')
-    create_parser.add_argument('--output', '-o', help='Output directory (defaults to current directory)')
+    create_parser.add_argument('--output', '-o', help='Output directory (defaults to ./output); with --format, '
+                                                      'the archive path or directory, or - for stdout')
+    create_parser.add_argument('--format', choices=ARCHIVE_FORMATS, dest='archive_format',
+                               help='Write the project as a zip or tar.gz archive instead of a directory')
+    create_parser.add_argument('--jobs', '-j', type=int, default=1, help='Number of files to render concurrently (default: 1)')
+    create_parser.add_argument('--link', choices=LINK_MODES, dest='link_mode',
+                               help='How to write files that need no substitution (default: the link_mode setting, "copy")')
+
+    # Update command
+    update_parser = subparsers.add_parser('update', parents=[timing_options], help='Upgrade a generated project to the latest version of its template')
+    update_parser.add_argument('project_dir', nargs='?', default='.', help='Project directory (defaults to the current directory)')
+
+    # Create-batch command
+    batch_parser = subparsers.add_parser('create-batch', parents=[timing_options], help='Create many projects from a JSON Lines manifest')
+    batch_parser.add_argument('manifest', help='Manifest file with one JSON project spec per line: category, template, project, '
+                                               'and optionally package, output, author, email, description')
+    batch_parser.add_argument('--jobs', '-j', type=int, default=1, help='Number of projects to create concurrently (default: 1)')
+    batch_parser.add_argument('--link', choices=LINK_MODES, dest='link_mode',
+                              help='How to write files that need no substitution (default: the link_mode setting, "copy")')
 
     args = parser.parse_args()
 
+    if getattr(args, 'timings', False) or getattr(args, 'timings_json', None):
+        import atexit
+        timings.enable()
+        atexit.register(write_timings, args.timings, args.timings_json, sys.argv[1:])
+
     # Handle commands
     if args.command == 'init':
+        prefetch = prefetch_templates()
         print_banner()
-        interactive_mode()
+        interactive_mode(prefetch)
 
     elif args.command == 'list':
         print_banner()
-        templates = list_templates()
+        templates = list_templates(refresh=args.refresh)
         display_templates(templates)
 
+    elif args.command == 'search':
+        print_banner()
+        if not search_templates(' '.join(args.query), limit=max(1, args.limit)):
+            sys.exit(1)
+
+    elif args.command == 'sync':
+        if not sync_templates(jobs=max(1, args.jobs)):
+            sys.exit(1)
+
+    elif args.command == 'cache':
+        if args.cache_command == 'stats':
+            show_cache_stats()
+        elif args.cache_command == 'prune':
+            if not prune_cache(args.max_bytes, gc=args.gc):
+                sys.exit(1)
+        elif args.cache_command == 'clear':
+            clear_cache()
+        else:
+            cache_parser.print_help()
+
     elif args.command == 'config':
         if args.config_command == 'set-token':
             set_github_token()
@@ -715,19 +1391,42 @@ Examples:
             repo_parser.print_help()
 
     elif args.command == 'create':
-        print_banner()
-        create_project(
-            args.category,
-            args.template,
-            args.project,
-            args.package,
-            args.output
-        )
+        output = args.output
+        messages = contextlib.nullcontext()
+        if output == '-':
+            if not args.archive_format:
+                create_parser.error("--output - requires --format")
+            # The archive goes to stdout, so everything else goes to stderr
+            output = sys.stdout.buffer
+            messages = contextlib.redirect_stdout(sys.stderr)
+        with messages:
+            print_banner()
+            created = create_project(
+                args.category,
+                args.template,
+                args.project,
+                args.package,
+                output,
+                jobs=max(1, args.jobs),
+                link_mode=args.link_mode,
+                archive_format=args.archive_format
+            )
+        if not created:
+            sys.exit(1)
+
+    elif args.command == 'update':
+        if not update_project(args.project_dir):
+            sys.exit(1)
+
+    elif args.command == 'create-batch':
+        if not create_batch(args.manifest, jobs=max(1, args.jobs), link_mode=args.link_mode):
+            sys.exit(1)
 
     else:
         # No command provided - run interactive mode
+        prefetch = prefetch_templates()
         print_banner()
-        interactive_mode()
+        interactive_mode(prefetch)
 
 
 if __name__ == "__main__":
@@ -1,10 +1,11 @@
-
 """
 Configuration management for the Boilerplate Manager.
 """
 
+import copy
 import os
 import json
+import threading
 from pathlib import Path
 
 CONFIG_DIR = Path.home() / ".boilerplates"
@@ -14,37 +15,116 @@ CACHE_DIR = CONFIG_DIR / "cache"
 DEFAULT_CONFIG = {
     "github_token": None,
     "private_repos": [],
-    "public_repo_url": "https://raw.githubusercontent.com/username/repo/main/public-templates.json"
+    "public_repo_url": "https://raw.githubusercontent.com/username/repo/main/public-templates.json",
+    # Seconds a cached copy of the public registry is used before revalidating it
+    "registry_ttl": 3600,
+    # Seconds a cached remote template without a pinned commit is used before fetching again
+    "template_refresh_interval": 3600,
+    # Seconds `list` and the interactive mode wait for the public registry and
+    # private repositories before going on with what has arrived
+    "discovery_timeout": 10,
+    # How unchanged template files are written to new projects: "copy",
+    # "reflink" (copy-on-write clone) or "hardlink" (read-only link into the
+    # template store, shared by every project using the same file)
+    "link_mode": "copy",
+    # Bytes ~/.boilerplates/cache may use before the least recently used
+    # template checkouts, store and plans are evicted, e.g. 2147483648 or
+    # "2G"; null for no limit
+    "cache_max_bytes": "2G"
 }
 
+# Process-level cache of the parsed config file, keyed on its (mtime, size)
+_config_cache = None
+_config_lock = threading.Lock()
+_config_dirs_ready = False
+
+
 def ensure_config_dir_exists():
     """Ensures that the configuration directory and cache directory exist."""
+    global _config_dirs_ready
+    if _config_dirs_ready:
+        return
     CONFIG_DIR.mkdir(exist_ok=True)
     CACHE_DIR.mkdir(exist_ok=True)
+    _config_dirs_ready = True
 
-def load_config():
-    """Loads the configuration from the JSON file."""
-    ensure_config_dir_exists()
-    if not CONFIG_FILE.exists():
+
+def _config_file_key():
+    """Returns (mtime_ns, size) of the config file, or None if it does not exist."""
+    try:
+        stat = CONFIG_FILE.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _read_config(key):
+    """Parses the config file and fills in missing default keys."""
+    if key is None:
         return DEFAULT_CONFIG
 
     try:
         with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
             config = json.load(f)
             # Ensure all default keys are present
-            for key, value in DEFAULT_CONFIG.items():
-                config.setdefault(key, value)
+            for name, value in DEFAULT_CONFIG.items():
+                config.setdefault(name, copy.deepcopy(value))
             return config
     except (json.JSONDecodeError, IOError) as e:
         print(f"Warning: Could not load config file. Using defaults. Error: {e}")
         return DEFAULT_CONFIG
 
+
+def load_config():
+    """Loads the configuration from the JSON file.
+
+    The file is parsed once per process and reused while its mtime and size
+    are unchanged. Each call returns a private copy, so callers can modify it
+    without affecting the cache or DEFAULT_CONFIG.
+    """
+    global _config_cache
+    ensure_config_dir_exists()
+    key = _config_file_key()
+    with _config_lock:
+        if _config_cache is None or _config_cache[0] != key:
+            _config_cache = (key, _read_config(key))
+        return copy.deepcopy(_config_cache[1])
+
+
+def clear_config_cache():
+    """Forgets the cached configuration so the next load_config() re-reads the file."""
+    global _config_cache
+    with _config_lock:
+        _config_cache = None
+
+
+def write_json(path, data, **options):
+    """
+    Writes JSON to `path` atomically: it goes to a temporary file that is then
+    renamed over `path`, so concurrent readers see the old or the new content
+    and never a partial file. The temporary file is removed if anything fails.
+    `options` are passed to json.dump(). Raises OSError.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **options)
+        os.replace(tmp_path, path)
+    finally:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+
+
 def save_config(config):
     """Saves the configuration to the JSON file."""
     ensure_config_dir_exists()
     try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2)
-    except IOError as e:
+        write_json(CONFIG_FILE, config, indent=2)
+    except OSError as e:
         print(f"Error: Could not save config file. Error: {e}")
-
+    finally:
+        clear_config_cache()
@@ -0,0 +1,287 @@
+"""
+Project manifests: what a generated project was rendered from, so it can be
+upgraded when its template changes.
+"""
+
+import json
+import os
+import shutil
+
+from . import store
+from .plan import LEGACY_TEMPLATE_CONFIG
+from .render import content_hash, match_rules, substitute
+
+MANIFEST_NAME = ".boilerplates.json"
+MANIFEST_VERSION = 1
+
+
+def _config_bytes(template_config):
+    return json.dumps(template_config, sort_keys=True).encode('utf-8')
+
+
+def config_hash(template_config):
+    """Returns a digest of a template's configuration; rules changing means every file may render differently."""
+    return content_hash(_config_bytes(template_config))
+
+
+def load_stored_config(digest):
+    """
+    Returns the template configuration keep_merge_bases() stored under a
+    config_hash(), with templates that have none getting the legacy one, or
+    None if it isn't in the store.
+    """
+    blob = store.find_blob(digest) if digest else None
+    if blob is None:
+        return None
+    try:
+        with open(blob, 'rb') as f:
+            return json.loads(f.read().decode('utf-8')) or LEGACY_TEMPLATE_CONFIG
+    except (OSError, ValueError):
+        return None
+
+
+def _source_name(source, template_path):
+    return os.path.relpath(source, template_path).replace(os.sep, '/')
+
+
+def record_outputs(template_path, outputs):
+    """
+    Builds the manifest's file table for a freshly rendered project.
+
+    `outputs` maps each destination to (source, source_hash, output_hash) as
+    filled in by render.render_template() or archive.render_archive(). Hashes
+    are None for files rendered verbatim without being read; those are hashed
+    through the store index, so they are only read once per template version.
+    """
+    files = {}
+    for destination, (source, source_hash, output_hash) in sorted(outputs.items()):
+        source_hash = source_hash or store.file_digest(source)
+        files[destination] = {
+            'source': _source_name(source, template_path),
+            'source_hash': source_hash,
+            'output_hash': output_hash or source_hash,
+        }
+    store.save_index()
+    return files
+
+
+def keep_merge_bases(template_path, template_config, files):
+    """
+    Keeps what a later update needs to rebuild a project's outputs as
+    three-way merge bases: the template sources named in the file table
+    `files` and the template configuration. Outputs themselves are never
+    stored; they are rendered again from these with the project's variables.
+    Both are content-addressed, so only the first project of a template
+    version adds anything to the store.
+    """
+    for entry in files.values():
+        if store.find_blob(entry['source_hash']) is not None:
+            continue
+        # Entries kept from an older template version may no longer match their source
+        source = os.path.join(template_path, entry['source'])
+        if os.path.isfile(source) and store.file_digest(source) == entry['source_hash']:
+            store.put_file(source, entry['source_hash'])
+    if store.find_blob(config_hash(template_config)) is None:
+        store.put_bytes(_config_bytes(template_config))
+    store.save_index()
+
+
+def read_manifest(target_dir):
+    """Loads a project's manifest. Raises OSError if it is missing and ValueError if it is invalid."""
+    with open(os.path.join(target_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or 'template' not in manifest or 'files' not in manifest:
+        raise ValueError(f"{MANIFEST_NAME} is not a project manifest")
+    return manifest
+
+
+def dump_manifest(template, variables, template_config, files):
+    """Returns the content of a project's manifest."""
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'template': template,
+        'config_hash': config_hash(template_config),
+        'variables': variables,
+        'files': files,
+    }
+    return json.dumps(manifest, indent=2) + '\n'
+
+
+def write_manifest(target_dir, template, variables, template_config, files):
+    """Writes a project's manifest."""
+    with open(os.path.join(target_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        f.write(dump_manifest(template, variables, template_config, files))
+
+
+def _render_output(source, replacers, destination):
+    with open(source, 'rb') as f:
+        data = f.read()
+    if not replacers:
+        return data
+    data, _, error = substitute(data, replacers)
+    if error:
+        print(f"Warning: Could not process {destination}: {error}")
+    return data
+
+
+def _write_output(path, data, source):
+    """Replaces a project file; never writes through it, as it may be hardlinked into the store."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        shutil.copymode(source, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def _merge_base(old, destination, base_rules):
+    """
+    Returns the content a project file was last rendered as, or None if it
+    can't be had. Verbatim outputs are their stored template source; others
+    are rendered again from it with `base_rules`, the (matcher, replacer)
+    rules the project was rendered with, and only used if they come out as
+    recorded.
+    """
+    if not old or not old.get('output_hash'):
+        return None
+    blob = store.find_blob(old['output_hash'])
+    if blob is None and base_rules is not None and old.get('source_hash'):
+        blob = store.find_blob(old['source_hash'])
+        replacers = match_rules(destination, base_rules)
+    else:
+        replacers = []
+    if blob is None:
+        return None
+
+    with open(blob, 'rb') as f:
+        data = f.read()
+    if replacers:
+        data, _, _ = substitute(data, replacers)
+    return data if content_hash(data) == old['output_hash'] else None
+
+
+def merge_file(current_path, base, data):
+    """
+    Three-way merges the new template output `data` into a locally modified
+    file, given the content `base` it was last rendered as.
+
+    Returns (merged, conflicts) where conflicted hunks carry git's conflict
+    markers, or None if git can't merge them (e.g. binary files).
+    """
+    import subprocess
+    import tempfile
+
+    paths = []
+    try:
+        for content in (base, data):
+            fd, path = tempfile.mkstemp(prefix='boilerplates-merge-')
+            paths.append(path)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+        result = subprocess.run(
+            ['git', 'merge-file', '-p', '-L', 'local', '-L', 'previous template', '-L', 'new template',
+             current_path] + paths,
+            capture_output=True,
+        )
+    except OSError:
+        return None
+    finally:
+        for path in paths:
+            os.unlink(path)
+    # The exit status is the number of conflicts; errors are negative or 255
+    if result.returncode < 0 or result.returncode >= 128:
+        return None
+    return result.stdout, result.returncode
+
+
+def upgrade_project(target_dir, old_files, directories, files, template_path, rerender_all=False, base_rules=None):
+    """
+    Brings a generated project up to date with a new version of its template.
+
+    `old_files` is the file table of the project's manifest; `directories`
+    and `files` are the new template version's resolved plan. Only files whose
+    template source changed (all of them with `rerender_all`) are rendered.
+    A project file the user never modified is replaced; a modified one is
+    three-way merged against the output it was last rendered as, rebuilt from
+    the store with the project's previous `base_rules` (see _merge_base()),
+    and left alone when no merge base is available. Files dropped from the
+    template are deleted unless modified.
+
+    Returns (files, results): the new file table and (status, destination)
+    pairs for everything that was touched or needs attention.
+    """
+    target_dir = os.fspath(target_dir)
+    new_files = {}
+    results = []
+
+    for directory in directories:
+        path = os.path.join(target_dir, directory)
+        if directory and not os.path.isdir(path):
+            os.makedirs(path, exist_ok=True)
+
+    for source, destination, replacers in files:
+        old = old_files.get(destination)
+        source_hash = store.file_digest(source)
+        if old and old.get('source_hash') == source_hash and not rerender_all:
+            new_files[destination] = old
+            continue
+
+        data = _render_output(source, replacers, destination)
+        output_hash = content_hash(data)
+        entry = {
+            'source': _source_name(source, template_path),
+            'source_hash': source_hash,
+            'output_hash': output_hash,
+        }
+        new_files[destination] = entry
+        path = os.path.join(target_dir, destination)
+
+        if not os.path.lexists(path):
+            if old:
+                results.append(('deleted locally', destination))
+            else:
+                _write_output(path, data, source)
+                results.append(('added', destination))
+            continue
+
+        current_hash = store.hash_file(path)
+        if current_hash == output_hash:
+            continue
+        if old and current_hash == old.get('output_hash'):
+            _write_output(path, data, source)
+            results.append(('updated', destination))
+            continue
+
+        # Modified locally (or an untracked file in the way): merge or leave it
+        base = _merge_base(old, destination, base_rules)
+        merged = merge_file(path, base, data) if base is not None else None
+        if merged is None:
+            # Keep the old entry, so the change is offered again next time
+            if old:
+                new_files[destination] = old
+            else:
+                del new_files[destination]
+            results.append(('kept, modified locally', destination))
+            continue
+        content, conflicts = merged
+        _write_output(path, content, source)
+        results.append(('conflict' if conflicts else 'merged', destination))
+
+    for destination, old in old_files.items():
+        if destination in new_files:
+            continue
+        path = os.path.join(target_dir, destination)
+        if not os.path.lexists(path):
+            continue
+        if store.hash_file(path) == old.get('output_hash'):
+            os.unlink(path)
+            results.append(('removed', destination))
+        else:
+            results.append(('kept, removed from template', destination))
+
+    store.save_index()
+    return new_files, results
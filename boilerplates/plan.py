@@ -0,0 +1,177 @@
+"""
+Render plans: the variable-independent work of rendering a template, cached
+on disk per template version.
+"""
+
+import json
+import os
+
+from . import config as cfg
+from .render import (
+    BINARY_EXTENSIONS,
+    IGNORED_NAMES,
+    compile_bytes_pattern,
+    compile_glob,
+    match_rules,
+    rename_path,
+    search_file,
+)
+
+PLAN_CACHE_DIR = cfg.CACHE_DIR / "plans"
+
+# Bumped whenever the plan format or the way plans are computed changes
+PLAN_VERSION = 1
+
+# Templates without a template.json only get 'myproject' renamed and replaced
+LEGACY_TEMPLATE_CONFIG = {
+    'rename': {'myproject': '{{package_name}}'},
+    'replace': [{'glob': '**/*', 'values': {'myproject': '{{package_name}}'}}],
+}
+
+
+class RenderPlan:
+    """What rendering a template involves, independent of the project's variables.
+
+    `files` holds [relative_path, matched, hits] entries. `matched` lists the
+    indexes of the replace rules whose glob accepts the file's destination, or
+    is None when the destination depends on variables and is matched at
+    resolve time. `hits` lists the rules whose keys occur in the file at all;
+    a file no matched rule hits is copied without being read.
+    """
+
+    def __init__(self, template_path, directories, files):
+        self.template_path = template_path
+        self.directories = directories
+        self.files = files
+
+    def resolve(self, renames, rules):
+        """
+        Applies resolved renames and compiled (matcher, replacer) rules, in
+        template.json order, and returns (directories, files) in the form of
+        render.plan_template().
+        """
+        directories = [rename_path(directory, renames) if directory else '' for directory in self.directories]
+        indexed = [(matcher, index) for index, (matcher, _) in enumerate(rules)]
+        files = []
+        for relative_path, matched, hits in self.files:
+            destination = rename_path(relative_path, renames)
+            if matched is None:
+                matched = match_rules(destination, indexed)
+            replacers = []
+            if any(index in hits for index in matched):
+                replacers = [rules[index][1] for index in matched]
+            files.append((os.path.join(self.template_path, relative_path), destination, replacers))
+        return directories, files
+
+
+def scan_template(template_path):
+    """
+    Stats a template in one walk.
+
+    Returns (fingerprint, directories, files): a hash of PLAN_VERSION, the
+    path of every directory and the path, size and mtime of every file
+    (template.json included), plus the relative directories and files to
+    render, in render order.
+    """
+    import hashlib
+
+    digest = hashlib.sha256(f"v{PLAN_VERSION}\n".encode('utf-8'))
+    directories = []
+    files = []
+    for root, dirs, names in os.walk(template_path, followlinks=True):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_NAMES)
+        relative_root = os.path.relpath(root, template_path)
+        if relative_root == os.curdir:
+            relative_root = ''
+        elif os.sep != '/':
+            relative_root = relative_root.replace(os.sep, '/')
+        directories.append(relative_root)
+        # Empty directories are rendered too
+        digest.update(f"{relative_root}/\n".encode('utf-8', 'surrogateescape'))
+        prefix = relative_root + '/' if relative_root else ''
+
+        for name in sorted(names):
+            try:
+                st = os.stat(os.path.join(root, name))
+                stamp = f"{st.st_size}:{st.st_mtime_ns}"
+            except OSError:
+                stamp = '-'
+            digest.update(f"{prefix}{name}\0{stamp}\n".encode('utf-8', 'surrogateescape'))
+            if name not in IGNORED_NAMES:
+                files.append(prefix + name)
+    return digest.hexdigest(), directories, files
+
+
+def build_plan(template_path, template_config, directories, files):
+    """
+    Computes the RenderPlan of a scanned template.
+
+    Rules are matched against destinations with the raw rename templates, so
+    only files whose destination contains a {{variable}} are left for
+    resolve(). Every file rules may apply to is searched once, memory-mapped,
+    for the keys of those rules; rules whose keys contain a {{variable}}
+    always count as hits.
+    """
+    template_config = template_config or LEGACY_TEMPLATE_CONFIG
+    raw_renames = list(template_config.get('rename', {}).items())
+    rules = template_config.get('replace', [])
+    indexed = [(compile_glob(rule.get('glob', '**/*')), index) for index, rule in enumerate(rules)]
+
+    always_hit = set()
+    screens = {}
+    for index, rule in enumerate(rules):
+        keys = sorted((key for key in rule.get('values', {}) if key), key=len, reverse=True)
+        if any('{{' in key for key in keys):
+            always_hit.add(index)
+        elif keys:
+            screens[index] = compile_bytes_pattern(keys)
+
+    plan_files = []
+    for relative_path in files:
+        root, _, name = relative_path.rpartition('/')
+        destination_root = rename_path(root, raw_renames) if root else ''
+        destination = rename_path(relative_path, raw_renames)
+        if '{{' in destination or '{{' in destination_root:
+            matched = None
+            candidates = range(len(rules)) if not name.endswith(BINARY_EXTENSIONS) else []
+        else:
+            matched = candidates = match_rules(destination, indexed)
+
+        hits = [index for index in candidates if index in always_hit]
+        screened = [index for index in candidates if index in screens]
+        if screened:
+            try:
+                found = search_file(os.path.join(template_path, relative_path), [screens[index] for index in screened])
+                hits += [screened[position] for position in found]
+            except OSError:
+                hits += screened
+        plan_files.append([relative_path, matched, sorted(hits)])
+    return RenderPlan(template_path, directories, plan_files)
+
+
+def _write_plan(path, plan):
+    try:
+        cfg.write_json(path, {'directories': plan.directories, 'files': plan.files})
+    except OSError as e:
+        print(f"Warning: Could not cache render plan: {e}")
+
+
+def load_plan(template_path, template_config):
+    """
+    Returns the RenderPlan of a template.
+
+    The template is only stat'ed; while no file changed since the plan was
+    built it is read back from PLAN_CACHE_DIR, and otherwise built and cached.
+    """
+    fingerprint, directories, files = scan_template(template_path)
+    cache_file = PLAN_CACHE_DIR / f"{fingerprint}.json"
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return RenderPlan(template_path, data['directories'], data['files'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    plan = build_plan(template_path, template_config, directories, files)
+    _write_plan(cache_file, plan)
+    return plan
@@ -0,0 +1,94 @@
+"""
+Public template registry fetching with an on-disk HTTP cache.
+"""
+
+import json
+import re
+import time
+import zlib
+
+from . import config as cfg
+
+REGISTRY_CACHE_DIR = cfg.CACHE_DIR / "registry"
+
+
+class RegistryError(Exception):
+    """Raised when the registry cannot be fetched and no cached copy exists."""
+
+
+def _cache_paths(url):
+    """Returns the (body, metadata) cache file paths for a registry URL."""
+    # A readable, filesystem-safe key; the checksum keeps truncated URLs apart
+    key = re.sub(r'[^A-Za-z0-9._-]+', '_', url)[:100]
+    key = f"{key}-{zlib.crc32(url.encode('utf-8')):08x}"
+    return REGISTRY_CACHE_DIR / f"{key}.json", REGISTRY_CACHE_DIR / f"{key}.meta.json"
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data, warn=print):
+    try:
+        cfg.write_json(path, data)
+    except OSError as e:
+        warn(f"Warning: Could not cache public templates: {e}")
+
+
+def fetch_registry(url, ttl=None, timeout=10, warn=print):
+    """
+    Returns the parsed registry JSON at `url`, using the on-disk cache.
+
+    A cached copy younger than `ttl` seconds (the `registry_ttl` setting by
+    default) is returned without touching the network. Older copies are
+    revalidated with If-None-Match / If-Modified-Since, so an unchanged
+    registry costs a 304 and no download. If the request fails and a cached
+    copy exists, it is returned with a warning instead (stale-if-error);
+    otherwise RegistryError is raised. Warnings are passed to `warn`.
+    """
+    if ttl is None:
+        ttl = cfg.load_config().get('registry_ttl', cfg.DEFAULT_CONFIG['registry_ttl'])
+
+    body_path, meta_path = _cache_paths(url)
+    meta = _read_json(meta_path) or {}
+    cached = _read_json(body_path) if meta else None
+
+    if cached is not None and time.time() - meta.get('fetched_at', 0) < ttl:
+        return cached
+
+    headers = {}
+    if cached is not None:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    # Imported here so a fresh cache never pays for loading requests
+    import requests
+
+    try:
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached is not None:
+            data = cached
+        else:
+            response.raise_for_status()
+            data = response.json()
+            _write_json(body_path, data, warn)
+            meta = {
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+    except (requests.exceptions.RequestException, ValueError) as e:
+        if cached is None:
+            raise RegistryError(e) from e
+        warn(f"Warning: Could not refresh public templates, using cached copy: {e}")
+        return cached
+
+    meta['fetched_at'] = time.time()
+    _write_json(meta_path, meta, warn)
+    return data
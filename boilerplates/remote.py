@@ -0,0 +1,221 @@
+"""
+Fetching remote templates into the local cache with git.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+
+from . import config as cfg
+
+
+class FetchError(Exception):
+    """Raised when a remote template cannot be fetched."""
+
+
+# Pinned commits are full or abbreviated hashes. Servers only hand out
+# commits by their full object name, so abbreviated ones are looked up in the
+# fetched history of the branch
+_COMMIT = re.compile(r'[0-9a-f]{4,40}')
+
+
+def cache_key(url):
+    """Turns a repository URL into relative cache path parts, e.g. github.com/user/repo."""
+    key = re.sub(r'^[A-Za-z][A-Za-z0-9+.-]*://', '', url.strip())
+    key = re.sub(r'^[^@/]+@', '', key)  # credentials or the git@ of scp-style URLs
+    key = re.sub(r'\.git$', '', key.rstrip('/'))
+    key = key.replace(':', '/')
+    return [part for part in key.split('/') if part not in ('', '.', '..')]
+
+
+def template_cache_path(url, subpath=None):
+    """
+    Returns the cache directory holding a checkout of `url`.
+
+    Templates that live in a subdirectory of a repository get a checkout of
+    their own, so each one only contains the files it needs.
+    """
+    parts = cache_key(url)
+    if subpath:
+        parts[-1] += '@' + re.sub(r'[^A-Za-z0-9._-]+', '-', subpath.strip('/'))
+    return cfg.CACHE_DIR.joinpath(*parts)
+
+
+def template_dir(checkout, subpath=None):
+    """Returns the template directory inside a checkout."""
+    return checkout / subpath.strip('/') if subpath else checkout
+
+
+def _with_token(url, token):
+    if token and url.startswith('https://'):
+        return url.replace('https://', f'https://{token}@', 1)
+    return url
+
+
+def _git(*args, cwd=None):
+    """Runs a git command and returns its stdout, raising FetchError on failure."""
+    command = ['git']
+    if cwd is not None:
+        command += ['-C', str(cwd)]
+    try:
+        result = subprocess.run(command + list(args), check=True, capture_output=True)
+    except FileNotFoundError as e:
+        raise FetchError(f"git is not installed: {e}") from e
+    except subprocess.CalledProcessError as e:
+        raise FetchError(e.stderr.decode(errors='replace').strip()) from e
+    return result.stdout.decode(errors='replace').strip()
+
+
+def head_commit(checkout):
+    """Returns the commit a checkout is at, read from .git/HEAD without running git where possible."""
+    try:
+        head = (checkout / '.git' / 'HEAD').read_text(encoding='utf-8').strip()
+    except OSError:
+        return None
+    if not head.startswith('ref:'):
+        return head
+    try:
+        return _git('rev-parse', 'HEAD', cwd=checkout)
+    except FetchError:
+        return None
+
+
+def needs_update(checkout, commit=None, max_age=0):
+    """
+    Decides whether an existing checkout has to be fetched again.
+
+    A pinned checkout is current once HEAD is at the pinned commit. An
+    unpinned one is current for `max_age` seconds after its last fetch.
+    """
+    if commit:
+        head = head_commit(checkout)
+        return not (head and head.startswith(commit.strip().lower()))
+    try:
+        fetched_at = os.path.getmtime(checkout / '.git' / 'FETCH_HEAD')
+    except OSError:
+        return True
+    return time.time() - fetched_at >= max_age
+
+
+def _fetch_and_checkout(checkout, ref, prefix=None):
+    """
+    Fetches only the tip of `ref` (no history, blobs on demand) and checks it
+    out, or with an abbreviated commit `prefix`, the commit it names in the
+    history of `ref`.
+    """
+    if not prefix:
+        _git('fetch', '--quiet', '--depth', '1', '--filter=blob:none', 'origin', ref, cwd=checkout)
+        _git('checkout', '--quiet', '--force', 'FETCH_HEAD', cwd=checkout)
+        return
+    unshallow = ['--unshallow'] if (checkout / '.git' / 'shallow').exists() else []
+    _git('fetch', '--quiet', *unshallow, '--filter=blob:none', 'origin', ref, cwd=checkout)
+    try:
+        commit = _git('rev-parse', '--verify', '--quiet', f'{prefix}^{{commit}}', cwd=checkout)
+    except FetchError:
+        raise FetchError(f"Pinned commit '{prefix}' does not name one commit of '{ref}'") from None
+    _git('checkout', '--quiet', '--force', commit, cwd=checkout)
+
+
+def _clone(url, checkout, subpath, ref, prefix=None):
+    """
+    Creates a shallow, blobless checkout of `ref`. With `subpath` the checkout
+    is sparse, so only the blobs under that directory are ever downloaded.
+
+    The clone is staged in a hidden sibling directory and renamed into place
+    once complete, so nobody ever sees a partial checkout.
+    """
+    import tempfile
+    from pathlib import Path
+
+    checkout.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{checkout.name}.", dir=checkout.parent))
+    try:
+        _git('init', '--quiet', cwd=staging)
+        _git('remote', 'add', 'origin', url, cwd=staging)
+        if subpath:
+            _git('config', 'core.sparseCheckout', 'true', cwd=staging)
+            sparse_file = staging / '.git' / 'info' / 'sparse-checkout'
+            sparse_file.parent.mkdir(parents=True, exist_ok=True)
+            sparse_file.write_text(f"/{subpath.strip('/')}/\n", encoding='utf-8')
+        _fetch_and_checkout(staging, ref, prefix)
+        # Leftovers of a checkout that lost its .git are replaced
+        if checkout.exists():
+            shutil.rmtree(checkout)
+        os.rename(staging, checkout)
+    except (FetchError, OSError):
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def fetch_template(url, subpath=None, branch=None, commit=None, token=None, max_age=0):
+    """
+    Makes a remote template available locally and returns its directory.
+
+    Only what the template needs is fetched: a depth-1, blobless checkout of
+    the pinned `commit` (or the tip of `branch`, or the remote HEAD), sparse
+    to `subpath` when the template lives in a subdirectory of the repository.
+    An abbreviated `commit` costs the branch's commit history instead. An
+    existing checkout is left alone while needs_update() says it is current,
+    and is otherwise moved to the latest revision the same way. Callers
+    sharing the cache hold the checkout's exclusive lock (see
+    cache.acquire()). Raises FetchError if git fails or `commit` is not a
+    commit hash.
+    """
+    pin = commit.strip().lower() if commit else None
+    if pin and not _COMMIT.fullmatch(pin):
+        raise FetchError(f"Pinned commit '{commit}' is not a commit hash")
+
+    checkout = template_cache_path(url, subpath)
+    if pin and len(pin) == 40:
+        ref, prefix = pin, None
+    else:
+        ref, prefix = branch or 'HEAD', pin
+
+    if (checkout / '.git').exists():
+        if needs_update(checkout, commit, max_age):
+            _fetch_and_checkout(checkout, ref, prefix)
+    else:
+        _clone(_with_token(url, token), checkout, subpath, ref, prefix)
+
+    return template_dir(checkout, subpath)
+
+
+def _local_repository(url):
+    """Returns the directory of a repository given by a path or file:// URL, or None for network URLs."""
+    if url.startswith('file://'):
+        path = url[len('file://'):]
+    elif '://' in url:
+        return None
+    else:
+        path = url
+    return path if os.path.isdir(path) else None
+
+
+def read_template_config(url, subpath=None):
+    """
+    Reads the template.json of a remote template without fetching it.
+
+    It comes from the template's cached checkout if there is one, and
+    otherwise straight out of git for repositories on this machine. Returns
+    None if neither has it or it is not valid JSON.
+    """
+    path = template_dir(template_cache_path(url, subpath), subpath) / 'template.json'
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError:
+        return None
+    except OSError:
+        pass
+
+    repository = _local_repository(url)
+    if repository is None:
+        return None
+    name = f"{subpath.strip('/')}/template.json" if subpath else 'template.json'
+    try:
+        return json.loads(_git('show', f"HEAD:{name}", cwd=repository))
+    except (FetchError, ValueError):
+        return None
@@ -0,0 +1,594 @@
+"""
+Rendering helpers for the Boilerplate Manager.
+"""
+
+import mmap
+import os
+import re
+import shutil
+import sys
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+from . import timings
+
+# Template entries never copied into a generated project
+IGNORED_NAMES = ('template.json', '.git')
+
+# Directories never descended into when rewriting generated files
+SKIP_DIRS = ('__pycache__', '.git', 'node_modules', '.venv', 'venv')
+
+# File extensions treated as binary and never rewritten
+BINARY_EXTENSIONS = ('.pyc', '.png', '.jpg', '.gif', '.ico', '.woff', '.woff2', '.ttf')
+
+# With jobs > 1, text files at least this large are substituted in a worker process
+LARGE_FILE_THRESHOLD = 8 * 1024 * 1024
+
+# How files that need no substitution are materialized in the output
+LINK_MODES = ('copy', 'reflink', 'hardlink')
+
+
+class Replacer:
+    """Applies a replacement mapping to text in a single pass.
+
+    All keys are merged into one alternation regex, longest key first, so each
+    position in the text is matched at most once and text inserted by one
+    replacement is never rewritten by another.
+    """
+
+    def __init__(self, replacements):
+        # Empty keys would match between every character; skip them.
+        self.replacements = {old: new for old, new in replacements.items() if old}
+        keys = sorted(self.replacements, key=len, reverse=True)
+        self.pattern = re.compile('|'.join(re.escape(key) for key in keys)) if keys else None
+
+    def __bool__(self):
+        return self.pattern is not None
+
+    def __call__(self, text):
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(self._lookup, text)
+
+    def _lookup(self, match):
+        return self.replacements[match.group(0)]
+
+
+def compile_bytes_pattern(keys):
+    """Compiles strings into one bytes regex matching any of them as UTF-8, longest first."""
+    keys = sorted(keys, key=len, reverse=True)
+    return re.compile(b'|'.join(re.escape(key.encode('utf-8')) for key in keys))
+
+
+@contextmanager
+def _mapped(path):
+    """
+    Yields a file's content memory-mapped, so it can be searched in place
+    without being read into Python memory or decoded; content is only loaded
+    for files that can't be mapped (empty or special files).
+    """
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            data = f.read()
+        try:
+            yield data
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+
+@lru_cache(maxsize=256)
+def _combined_pattern(patterns):
+    """Merges bytes patterns into one regex with a group per pattern, so one scan looks for all of them."""
+    return re.compile(b'|'.join(b'(' + pattern.pattern + b')' for pattern in patterns))
+
+
+def search_file(path, patterns):
+    """
+    Returns the indexes of the bytes `patterns` that occur in a file.
+
+    The memory-mapped file is scanned once for all patterns together, stopping
+    as soon as each has matched. Only when some but not all of them matched
+    are the rest searched for separately, as their keys may overlap a match.
+    """
+    if not patterns:
+        return []
+    patterns = tuple(patterns)
+    found = set()
+    with _mapped(path) as data:
+        for match in _combined_pattern(patterns).finditer(data):
+            found.add(match.lastindex - 1)
+            if len(found) == len(patterns):
+                break
+        if found:
+            found.update(index for index, pattern in enumerate(patterns) if index not in found and pattern.search(data))
+    return sorted(found)
+
+
+@lru_cache(maxsize=256)
+def _substitution_pattern(replacers):
+    return compile_bytes_pattern([key for replacer in replacers for key in replacer.replacements])
+
+
+def needs_substitution(path, replacers):
+    """
+    Reports whether any key of `replacers` occurs in a file, without decoding
+    it. The keys of all replacers are merged into one bytes regex, and the
+    memory-mapped file is scanned until its first match.
+    """
+    replacers = tuple(replacer for replacer in replacers if replacer)
+    if not replacers:
+        return False
+    with _mapped(path) as data:
+        return _substitution_pattern(replacers).search(data) is not None
+
+
+def compile_replacements(replacements):
+    """Compiles a {old: new} mapping into a reusable single-pass Replacer."""
+    if isinstance(replacements, Replacer):
+        return replacements
+    return Replacer(replacements)
+
+
+def snake_case(text):
+    """Turns text into a valid Python package name: lowercase, underscores, no leading digits."""
+    text = re.sub(r'[^a-zA-Z0-9_]', '_', text)
+    text = re.sub(r'^[^a-zA-Z_]+', '', text)
+    text = re.sub(r'_+', '_', text)  # Replace multiple underscores with single
+    return text.lower().strip('_')
+
+
+def _words(text):
+    """Splits text into words at separators, camelCase boundaries and runs of digits."""
+    return re.findall(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+', text)
+
+
+def kebab_case(text):
+    return '-'.join(word.lower() for word in _words(text))
+
+
+def pascal_case(text):
+    return ''.join(word.capitalize() for word in _words(text))
+
+
+def camel_case(text):
+    text = pascal_case(text)
+    return text[:1].lower() + text[1:]
+
+
+# Filters usable as {{ name | filter }} and as a prompt's "format"; 'default'
+# takes an argument and is handled by render_text()
+FILTERS = {
+    'snake_case': snake_case,
+    'kebab_case': kebab_case,
+    'pascal_case': pascal_case,
+    'camel_case': camel_case,
+    'upper': str.upper,
+    'lower': str.lower,
+}
+
+# {{ name }}, optionally followed by filters: {{ name | upper | default("x") }}
+_VARIABLE_TOKEN = re.compile(
+    r'\{\{\s*([^\s{}|]+)\s*((?:\|\s*\w+\s*(?:\(\s*(?:"[^"]*"|\'[^\']*\')\s*\))?\s*)*)\}\}')
+_FILTER_CALL = re.compile(r'\|\s*(\w+)\s*(?:\(\s*(?:"([^"]*)"|\'([^\']*)\')\s*\))?')
+
+
+@lru_cache(maxsize=1024)
+def compile_text_template(text):
+    """
+    Splits a template string into literal text and (token, name, filters)
+    parts, once per distinct string. Tokens using an unknown filter stay
+    literal text.
+    """
+    parts = []
+    position = 0
+    for match in _VARIABLE_TOKEN.finditer(text):
+        if match.start() > position:
+            parts.append(text[position:match.start()])
+        filters = tuple(
+            (call.group(1), call.group(2) if call.group(2) is not None else call.group(3))
+            for call in _FILTER_CALL.finditer(match.group(2))
+        )
+        if all(name == 'default' or name in FILTERS for name, _ in filters):
+            parts.append((match.group(0), match.group(1), filters))
+        else:
+            parts.append(match.group(0))
+        position = match.end()
+    if position < len(text):
+        parts.append(text[position:])
+    return tuple(parts)
+
+
+def render_text(text, variables):
+    """
+    Replaces {{ name | filter }} tokens with variable values in one pass over
+    the compiled template, so the cost doesn't depend on how many variables
+    exist. Tokens naming an unknown variable without a default are kept.
+    """
+    if '{{' not in text:
+        return text
+    rendered = []
+    for part in compile_text_template(text):
+        if isinstance(part, str):
+            rendered.append(part)
+            continue
+        token, name, filters = part
+        value = variables.get(name)
+        for filter_name, argument in filters:
+            if filter_name == 'default':
+                if not value:
+                    value = argument
+            elif value is not None:
+                value = FILTERS[filter_name](str(value))
+        rendered.append(token if value is None else str(value))
+    return ''.join(rendered)
+
+
+def expand_brace_pattern(pattern):
+    """Expands brace patterns like '**/*.{py,md}' into ['**/*.py', '**/*.md']."""
+    # Find brace expansion pattern {a,b,c}
+    brace_match = re.search(r'\{([^}]+)\}', pattern)
+
+    if not brace_match:
+        # No braces, return as-is
+        return [pattern]
+
+    # Extract the options inside braces
+    options = brace_match.group(1).split(',')
+
+    # Get the part before and after the braces
+    before = pattern[:brace_match.start()]
+    after = pattern[brace_match.end():]
+
+    # Generate all combinations
+    expanded = [f"{before}{opt.strip()}{after}" for opt in options]
+
+    # Recursively expand if there are more braces
+    final_expanded = []
+    for exp in expanded:
+        final_expanded.extend(expand_brace_pattern(exp))
+
+    return final_expanded
+
+
+def _translate_segment(segment):
+    """Translates one path segment of a glob into a regex that never crosses '/'."""
+    parts = []
+    i, n = 0, len(segment)
+    while i < n:
+        c = segment[i]
+        i += 1
+        if c == '*':
+            while i < n and segment[i] == '*':
+                i += 1
+            parts.append('[^/]*')
+        elif c == '?':
+            parts.append('[^/]')
+        elif c == '[':
+            j = i
+            if j < n and segment[j] in '!^':
+                j += 1
+            if j < n and segment[j] == ']':
+                j += 1
+            while j < n and segment[j] != ']':
+                j += 1
+            if j >= n:
+                parts.append('\\[')
+            else:
+                body = segment[i:j].replace('\\', '\\\\')
+                if body[:1] in ('!', '^'):
+                    body = '^' + body[1:]
+                parts.append(f'[{body}]')
+                i = j + 1
+        else:
+            parts.append(re.escape(c))
+    return ''.join(parts)
+
+
+def _translate_glob(pattern):
+    """
+    Translates a brace-free glob into a regex. '*' and '?' stay inside one path
+    segment, while a '**' segment spans any number of directories (including none).
+    """
+    parts = []
+    segments = pattern.split('/')
+    for index, segment in enumerate(segments):
+        last = index == len(segments) - 1
+        if segment == '**':
+            parts.append('.*' if last else '(?:.*/)?')
+            continue
+        parts.append(_translate_segment(segment))
+        if not last:
+            parts.append('/')
+    return ''.join(parts)
+
+
+class PathMatcher:
+    """Matches relative paths against a set of glob patterns in one regex operation.
+
+    Brace patterns are expanded once and every resulting glob is merged into a
+    single anchored alternation, so matching a file costs one regex call no
+    matter how many patterns the rule lists.
+    """
+
+    def __init__(self, patterns):
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        expanded = []
+        for pattern in patterns:
+            for glob in expand_brace_pattern(pattern):
+                if glob not in expanded:
+                    expanded.append(glob)
+        self.patterns = tuple(expanded)
+        self._match = None
+        if expanded:
+            regex = '(?:%s)\\Z' % '|'.join(_translate_glob(glob) for glob in expanded)
+            self._match = re.compile(regex, re.DOTALL).match
+
+    def match(self, path):
+        """Returns True if the relative path matches any of the patterns."""
+        if self._match is None:
+            return False
+        path = os.fspath(path)
+        if os.sep != '/':
+            path = path.replace(os.sep, '/')
+        return self._match(path) is not None
+
+
+@lru_cache(maxsize=256)
+def compile_glob(patterns):
+    """Returns a cached PathMatcher for a glob string or a tuple of globs."""
+    return PathMatcher(patterns)
+
+
+def matches_any_pattern(file_path, patterns):
+    """Check if file_path matches any of the given glob patterns."""
+    if isinstance(patterns, list):
+        patterns = tuple(patterns)
+    return compile_glob(patterns).match(file_path)
+
+
+def rename_path(relative_path, renames):
+    """Applies ordered (old, new) renames to a '/'-separated relative path."""
+    for old, new in renames:
+        if old == new:
+            continue
+        if relative_path == old or relative_path.startswith(old + '/'):
+            relative_path = new + relative_path[len(old):]
+    return relative_path
+
+
+def match_rules(destination, rules):
+    """
+    Returns the values of the (matcher, value) rules whose matcher accepts a
+    destination path, in rule order. Binary files and files under SKIP_DIRS
+    match no rules.
+    """
+    root, _, name = destination.rpartition('/')
+    if name.endswith(BINARY_EXTENSIONS) or any(part in SKIP_DIRS for part in root.split('/')):
+        return []
+    return [value for matcher, value in rules if matcher.match(destination)]
+
+
+@timings.timed('plan_template')
+def plan_template(template_path, renames, rules):
+    """
+    Walks a template once and works out where every entry ends up.
+
+    Returns (directories, files): the destination directories to create, in
+    walk order, and (source, destination, replacers) tuples where `replacers`
+    lists the replacers of every rule matching the renamed destination path.
+    Files with no replacers are copied verbatim.
+    """
+    directories = []
+    files = []
+    for root, dirs, names in os.walk(template_path, followlinks=True):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_NAMES)
+        relative_root = os.path.relpath(root, template_path)
+        if relative_root == os.curdir:
+            relative_root = ''
+        elif os.sep != '/':
+            relative_root = relative_root.replace(os.sep, '/')
+
+        destination_root = rename_path(relative_root, renames) if relative_root else ''
+        directories.append(destination_root)
+        prefix = destination_root + '/' if destination_root else ''
+
+        for name in sorted(names):
+            if name in IGNORED_NAMES:
+                continue
+            destination = rename_path(prefix + name, renames)
+            files.append((os.path.join(root, name), destination, match_rules(destination, rules)))
+    return directories, files
+
+
+def _copy_file_range(infd, outfd, offset, count):
+    return os.copy_file_range(infd, outfd, count, offset, offset)
+
+
+def _sendfile(infd, outfd, offset, count):
+    return os.sendfile(outfd, infd, offset, count)
+
+
+# Kernel-side copy primitives, tried in order
+_ZERO_COPY_METHODS = []
+if hasattr(os, 'copy_file_range'):
+    _ZERO_COPY_METHODS.append(_copy_file_range)
+if hasattr(os, 'sendfile') and sys.platform.startswith('linux'):
+    _ZERO_COPY_METHODS.append(_sendfile)
+
+
+def _zero_copy(infd, outfd, size):
+    """Copies `size` bytes between descriptors in the kernel. Returns False if unsupported."""
+    for method in _ZERO_COPY_METHODS:
+        copied = 0
+        try:
+            while copied < size:
+                sent = method(infd, outfd, copied, size - copied)
+                if sent == 0:
+                    break
+                copied += sent
+        except OSError:
+            if copied:
+                raise
+            continue
+        return True
+    return False
+
+
+def copy_file(source, destination):
+    """Copies a file without passing its bytes through Python where the OS allows it."""
+    with open(source, 'rb') as fsrc, open(destination, 'wb') as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        if not size or not _zero_copy(fsrc.fileno(), fdst.fileno(), size):
+            shutil.copyfileobj(fsrc, fdst)
+    shutil.copystat(source, destination)
+
+
+def substitute(data, replacers):
+    """
+    Applies `replacers` in order to UTF-8 file content.
+
+    Returns (data, changed, error); undecodable content is returned untouched
+    along with the decode error.
+    """
+    try:
+        content = data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        return data, False, e
+
+    new_content = content
+    for replacer in replacers:
+        new_content = replacer(new_content)
+    if new_content == content:
+        return data, False, None
+    return new_content.encode('utf-8'), True, None
+
+
+def content_hash(data):
+    """Returns the SHA-256 hex digest of bytes, the name the template store gives that content."""
+    import hashlib
+
+    return hashlib.sha256(data).hexdigest()
+
+
+def render_file(source, destination, replacers, large_file_pool=None, link=None, prescreen=True):
+    """Writes one template file to its destination; returns its (source_hash, output_hash), or Nones if not read."""
+    materialize = link or copy_file
+    # Files containing none of the keys are copied or linked unread; callers
+    # pass `prescreen` False when a plan already screened them
+    if not replacers or (prescreen and not needs_substitution(source, replacers)):
+        materialize(source, destination)
+        return None, None
+
+    # Read once; the hashes come from the bytes in memory
+    with open(source, 'rb') as f:
+        data = f.read()
+    source_hash = content_hash(data)
+
+    if large_file_pool is not None and len(data) >= LARGE_FILE_THRESHOLD:
+        data, changed, error = large_file_pool.submit(substitute, data, replacers).result()
+    else:
+        data, changed, error = substitute(data, replacers)
+    if error:
+        print(f"Warning: Could not process {destination}: {error}")
+    if not changed and link is not None:
+        link(source, destination)
+        return source_hash, source_hash
+
+    with open(destination, 'wb') as f:
+        f.write(data)
+    shutil.copymode(source, destination)
+    return source_hash, content_hash(data) if changed else source_hash
+
+
+class LazyProcessPool:
+    """A process pool that is only started if something is submitted to it."""
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args):
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ProcessPoolExecutor
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor.submit(func, *args)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+
+
+def run_jobs(func, items, jobs=1):
+    """
+    Calls func(*item) for every item and returns the results in order.
+
+    With jobs > 1 the calls run on a thread pool of that size; per-file work is
+    mostly I/O, so threads overlap the latency of reads and writes.
+    """
+    if jobs <= 1 or len(items) <= 1:
+        return [func(*item) for item in items]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(lambda item: func(*item), items))
+
+
+@timings.timed('render_template')
+def render_template(template_path, target_dir, renames, rules, jobs=1, link_mode='copy', plan=None, outputs=None):
+    """
+    Renders a template into target_dir in one pass.
+
+    Every file is read once, renamed and substituted in memory, and written
+    once to its final path. With jobs > 1 files are rendered concurrently and
+    very large text files are substituted in worker processes; the output is
+    identical to a sequential run. With a `link_mode` other than 'copy', files
+    that need no substitution are reflinked or hardlinked from the template
+    store instead of copied (see store.link_file). A RenderPlan from
+    plan.load_plan() replaces walking and matching the template. If `outputs`
+    is a dict, it is filled with destination -> (source, source_hash,
+    output_hash) for every file, as returned by render_file(). Returns the
+    number of files whose content changed.
+    """
+    # Renaming destinations and matching rules against them
+    with timings.phase('match') as counts:
+        if plan is not None:
+            directories, files = plan.resolve(renames, rules)
+        else:
+            directories, files = plan_template(template_path, renames, rules)
+        counts['files'] = sum(1 for _, _, replacers in files if replacers)
+    with timings.phase('directories'):
+        for directory in directories:
+            os.makedirs(os.path.join(target_dir, directory), exist_ok=True)
+
+    link = None
+    if link_mode != 'copy':
+        from functools import partial
+        from . import store
+        link = partial(store.link_file, mode=link_mode)
+
+    large_file_pool = LazyProcessPool(min(jobs, os.cpu_count() or 1)) if jobs > 1 else None
+    try:
+        # A plan has already screened its files for keys
+        with timings.phase('replace') as counts:
+            results = run_jobs(render_file, [
+                (source, os.path.join(target_dir, destination), replacers, large_file_pool, link, plan is None)
+                for source, destination, replacers in files
+            ], jobs)
+            counts['files'] = len(files)
+            if timings.enabled():
+                counts['bytes'] = sum(os.path.getsize(source) for source, _, _ in files)
+    finally:
+        if large_file_pool is not None:
+            large_file_pool.shutdown()
+        if link is not None:
+            store.save_index()
+    if outputs is not None:
+        for (source, destination, _), hashes in zip(files, results):
+            outputs[destination] = (source,) + hashes
+    return sum(1 for source_hash, output_hash in results if output_hash != source_hash)
@@ -0,0 +1,171 @@
+"""
+Content-addressable store for template files, used to link unchanged files
+into generated projects instead of copying them.
+"""
+
+import json
+import os
+import threading
+
+from . import config as cfg
+from .render import copy_file
+
+OBJECTS_DIR = cfg.CACHE_DIR / "objects"
+INDEX_FILE = OBJECTS_DIR / "index.json"
+
+# ioctl request number of Linux FICLONE (share extents copy-on-write)
+FICLONE = 0x40049409
+
+# Source path -> [size, mtime_ns, sha256], so unchanged files are never rehashed
+_index = None
+_index_dirty = False
+_index_lock = threading.Lock()
+
+
+def hash_file(path):
+    """Returns the SHA-256 hex digest of a file's content."""
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_index():
+    global _index
+    if _index is None:
+        try:
+            with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+                _index = json.load(f)
+        except (OSError, ValueError):
+            _index = {}
+    return _index
+
+
+def file_digest(path, stat_result=None):
+    """Returns the SHA-256 of a file, reusing the store index while its size and mtime are unchanged."""
+    global _index_dirty
+    path = os.path.abspath(path)
+    st = stat_result or os.stat(path)
+    with _index_lock:
+        entry = _load_index().get(path)
+    if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+        return entry[2]
+
+    digest = hash_file(path)
+    with _index_lock:
+        _load_index()[path] = [st.st_size, st.st_mtime_ns, digest]
+        _index_dirty = True
+    return digest
+
+
+def save_index():
+    """Writes the digest index back to disk if it changed."""
+    global _index_dirty
+    with _index_lock:
+        if not _index_dirty:
+            return
+        try:
+            cfg.write_json(INDEX_FILE, _index)
+            _index_dirty = False
+        except OSError as e:
+            print(f"Warning: Could not save template store index: {e}")
+
+
+def blob_path(digest, executable=False):
+    """Returns where a blob lives; executable content is stored separately as links share modes."""
+    return OBJECTS_DIR / digest[:2] / (digest[2:] + ('.x' if executable else ''))
+
+
+def put_file(source, digest=None):
+    """
+    Adds a file to the store and returns its blob path.
+
+    Blobs are read-only, so a hardlinked project file can't be edited in
+    place and corrupt the store for other projects.
+    """
+    st = os.stat(source)
+    executable = bool(st.st_mode & 0o111)
+    blob = blob_path(digest or file_digest(source, st), executable)
+    if blob.exists():
+        return blob
+
+    blob.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = blob.with_name(f"{blob.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        copy_file(source, tmp_path)
+        os.chmod(tmp_path, 0o555 if executable else 0o444)
+        os.replace(tmp_path, blob)
+    finally:
+        if tmp_path.exists():
+            os.unlink(tmp_path)
+    return blob
+
+
+def put_bytes(data, executable=False):
+    """Adds content to the store and returns its digest."""
+    import hashlib
+
+    digest = hashlib.sha256(data).hexdigest()
+    blob = blob_path(digest, executable)
+    if blob.exists():
+        return digest
+
+    blob.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = blob.with_name(f"{blob.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o555 if executable else 0o444)
+        os.replace(tmp_path, blob)
+    finally:
+        if tmp_path.exists():
+            os.unlink(tmp_path)
+    return digest
+
+
+def find_blob(digest):
+    """Returns the path of a stored blob with this digest, or None."""
+    for executable in (False, True):
+        blob = blob_path(digest, executable)
+        if blob.exists():
+            return blob
+    return None
+
+
+def reflink(source, destination):
+    """Clones a file copy-on-write where the filesystem supports it. Returns False otherwise."""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    with open(source, 'rb') as fsrc, open(destination, 'wb') as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            return False
+    return True
+
+
+def link_file(source, destination, mode='copy'):
+    """
+    Materializes an unchanged template file at `destination`.
+
+    'reflink' clones the source copy-on-write; 'hardlink' links a read-only
+    blob from the store. Either falls back to a plain (zero-copy) copy when
+    the filesystem can't do it, e.g. across devices.
+    """
+    if mode == 'reflink':
+        if reflink(source, destination):
+            os.chmod(destination, os.stat(source).st_mode & 0o7777)
+            return
+    elif mode == 'hardlink':
+        try:
+            os.link(put_file(source), destination)
+            return
+        except OSError:
+            pass
+    copy_file(source, destination)
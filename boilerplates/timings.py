@@ -0,0 +1,94 @@
+"""
+Per-phase timing instrumentation, enabled with `--timings`.
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Phase name -> totals, in the order phases first started; None while disabled
+_phases = None
+_started = None
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def enable():
+    """Starts recording phases, discarding anything recorded before."""
+    global _phases, _started
+    with _lock:
+        _phases = {}
+        _started = time.perf_counter()
+
+
+def enabled():
+    return _phases is not None
+
+
+@contextmanager
+def phase(name):
+    """
+    Times a block as a phase. Phases nest per thread, so a phase started
+    inside another one is recorded as 'outer/inner'. Yields a dict the block
+    may set 'files' and 'bytes' counts in. Costs nothing while disabled.
+    """
+    counts = {}
+    if _phases is None:
+        yield counts
+        return
+
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(name)
+    full_name = '/'.join(stack)
+    with _lock:
+        record = _phases.setdefault(full_name, {'seconds': 0.0, 'calls': 0, 'files': 0, 'bytes': 0})
+    start = time.perf_counter()
+    try:
+        yield counts
+    finally:
+        elapsed = time.perf_counter() - start
+        stack.pop()
+        with _lock:
+            record['seconds'] += elapsed
+            record['calls'] += 1
+            record['files'] += counts.get('files', 0)
+            record['bytes'] += counts.get('bytes', 0)
+
+
+def timed(name):
+    """Decorator recording every call of a function as phase `name`."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _phases is None:
+                return func(*args, **kwargs)
+            with phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def report():
+    """Returns the recorded phases as a JSON-serializable dict."""
+    with _lock:
+        phases = [dict(name=name, **record) for name, record in (_phases or {}).items()]
+        total = time.perf_counter() - _started if _started is not None else 0.0
+    return {'total_seconds': total, 'phases': phases}
+
+
+def format_report(data=None):
+    """Formats a report() as an indented table, one phase per line."""
+    data = data or report()
+    lines = [f"{'Phase':<44} {'Time':>10} {'Calls':>6} {'Files':>7} {'Bytes':>12}"]
+    for entry in data['phases']:
+        depth = entry['name'].count('/')
+        label = '  ' * depth + entry['name'].rsplit('/', 1)[-1]
+        lines.append(
+            f"{label:<44} {entry['seconds'] * 1000:>8.1f}ms {entry['calls']:>6} "
+            f"{entry['files'] or '':>7} {entry['bytes'] or '':>12}"
+        )
+    lines.append(f"{'Total':<44} {data['total_seconds'] * 1000:>8.1f}ms")
+    return '\n'.join(lines)
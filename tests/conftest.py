@@ -0,0 +1,18 @@
+"""
+Shared test setup: every test session gets its own home directory, so the
+config and ~/.boilerplates/cache of the user running the tests are never
+read or written.
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+_home = tempfile.mkdtemp(prefix='boilerplates-tests-')
+os.environ['HOME'] = _home
+os.environ['USERPROFILE'] = _home
+atexit.register(shutil.rmtree, _home, True)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
@@ -0,0 +1,71 @@
+"""
+Tests rendering projects straight into archives.
+"""
+
+import hashlib
+import io
+import json
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from boilerplates import cli, store
+from boilerplates.plan import load_plan
+
+TEMPLATE = Path(__file__).resolve().parent.parent / 'boilerplates' / 'templates' / 'react' / 'react_spa'
+
+
+def prepared():
+    config = cli.load_template_config(TEMPLATE)
+    return TEMPLATE, config, load_plan(TEMPLATE, config), {'category': 'react', 'name': 'react_spa'}
+
+
+def read_members(archive_format, data):
+    if archive_format == 'zip':
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        return {name: archive.read(name) for name in archive.namelist() if not name.endswith('/')}
+    archive = tarfile.open(fileobj=io.BytesIO(data), mode='r:gz')
+    return {member.name: archive.extractfile(member).read() for member in archive.getmembers() if member.isfile()}
+
+
+@pytest.mark.parametrize('archive_format', ['zip', 'tar.gz'])
+def test_archive_manifest_hashes_without_touching_the_store(archive_format, monkeypatch):
+    def unexpected(*args, **kwargs):
+        raise AssertionError('archives must not read files again or write to the store')
+
+    for name in ('file_digest', 'hash_file', 'put_file', 'put_bytes'):
+        monkeypatch.setattr(store, name, unexpected)
+    stream = io.BytesIO()
+    assert cli.generate_project(prepared(), 'react/react_spa', 'Shop', output_dir=stream,
+                                verbose=False, archive_format=archive_format)
+
+    members = read_members(archive_format, stream.getvalue())
+    files = json.loads(members.pop('shop/.boilerplates.json'))['files']
+    assert set(files) == {name[len('shop/'):] for name in members}
+    for destination, entry in files.items():
+        assert hashlib.sha256(members['shop/' + destination]).hexdigest() == entry['output_hash']
+
+
+def test_archive_into_missing_directory_fails_cleanly(tmp_path, capsys):
+    path = tmp_path / 'missing' / 'shop.zip'
+    assert not cli.generate_project(prepared(), 'react/react_spa', 'Shop', output_dir=path,
+                                    verbose=False, archive_format='zip')
+    assert f"Could not create '{path}'" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('archive_format', ['zip', 'tar.gz'])
+def test_archive_accepts_files_dated_before_1980(archive_format, tmp_path):
+    template = tmp_path / 'template'
+    (template / 'src').mkdir(parents=True)
+    (template / 'template.json').write_text('{}', encoding='utf-8')
+    (template / 'src' / 'app.py').write_text("print('myproject')\n", encoding='utf-8')
+    for path in (template / 'src' / 'app.py', template / 'src', template):
+        os.utime(path, (0, 0))
+    config = cli.load_template_config(template)
+    stream = io.BytesIO()
+    assert cli.generate_project((template, config, load_plan(template, config), {'category': 'tests', 'name': 'app'}),
+                                'tests/app', 'Shop', output_dir=stream, verbose=False, archive_format=archive_format)
+    assert read_members(archive_format, stream.getvalue())['shop/src/app.py'] == b"print('shop')\n"
@@ -0,0 +1,52 @@
+"""
+Tests reading batch manifests and isolating failing projects in create-batch.
+"""
+
+import json
+
+import pytest
+
+from boilerplates import cli
+
+
+def write_manifest(path, specs):
+    path.write_text(''.join(json.dumps(spec) + '\n' for spec in specs), encoding='utf-8')
+    return path
+
+
+def test_read_batch_manifest_skips_comments_and_blank_lines(tmp_path):
+    path = tmp_path / 'projects.jsonl'
+    path.write_text('# projects\n\n{"category": "react", "template": "react_spa", "project": "Shop"}\n', encoding='utf-8')
+    assert cli.read_batch_manifest(path) == [{'category': 'react', 'template': 'react_spa', 'project': 'Shop'}]
+
+
+@pytest.mark.parametrize('spec, message', [
+    ({'category': 'react', 'template': 'react_spa'}, 'line 1: missing project'),
+    ({'category': 'react', 'template': 'react_spa', 'project': 123}, 'line 1: project must be a string'),
+    ({'category': 'react', 'template': 'react_spa', 'project': 'Shop', 'author': ['A']}, 'line 1: author must be a string'),
+    (['react', 'react_spa', 'Shop'], 'line 1: expected a JSON object'),
+])
+def test_read_batch_manifest_rejects_invalid_specs(tmp_path, spec, message):
+    path = write_manifest(tmp_path / 'projects.jsonl', [spec])
+    with pytest.raises(ValueError, match=message):
+        cli.read_batch_manifest(path)
+
+
+def test_failing_project_does_not_abort_batch(tmp_path, monkeypatch, capsys):
+    def generate_project(template, label, project_name, *args, **kwargs):
+        if project_name == 'Broken':
+            raise RuntimeError('boom')
+        return True
+
+    monkeypatch.setattr(cli, 'list_templates', lambda *args, **kwargs: {})
+    monkeypatch.setattr(cli, 'prepare_template', lambda *args, **kwargs: object())
+    monkeypatch.setattr(cli, 'generate_project', generate_project)
+    path = write_manifest(tmp_path / 'projects.jsonl', [
+        {'category': 'react', 'template': 'react_spa', 'project': name}
+        for name in ('Shop', 'Broken', 'Blog')
+    ])
+
+    assert cli.create_batch(path, jobs=2) is False
+    output = capsys.readouterr().out
+    assert 'Error: Broken: boom' in output
+    assert 'Created 2 of 3 projects.' in output
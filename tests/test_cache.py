@@ -0,0 +1,94 @@
+"""
+Tests LRU eviction of the template cache, and cache entry locks where the
+platform can't share them.
+"""
+
+import json
+import time
+
+import pytest
+
+from boilerplates import cache
+from boilerplates import config as cfg
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """A cache holding three template checkouts, render plans and registry metadata, oldest first."""
+    root = tmp_path / 'cache'
+    monkeypatch.setattr(cfg, 'CACHE_DIR', root)
+    monkeypatch.setattr(cache, 'USAGE_FILE', root / 'usage.json')
+    monkeypatch.setattr(cache, 'LOCKS_DIR', root / 'locks')
+    usage = {}
+    for last_used, key in enumerate(['github.com/user/old', 'plans', 'github.com/user/middle', 'github.com/user/new']):
+        path = root / key
+        (path / '.git' if key != 'plans' else path).mkdir(parents=True)
+        (path / 'data.bin').write_bytes(b'x' * 65536)
+        usage[key] = {'last_used': 1000 + last_used}
+    (root / 'registry').mkdir()
+    (root / 'registry' / 'registry.json').write_bytes(b'{}' * 65536)
+    (root / 'usage.json').write_text(json.dumps(usage), encoding='utf-8')
+    return root
+
+
+def budget_without(*keys):
+    """A budget just small enough that the entries at `keys` have to go."""
+    entries = cache.list_entries()
+    return sum(e['size'] for e in entries) - sum(e['size'] for e in entries if e['key'] in keys)
+
+
+def remaining(root):
+    return sorted(key for key in ('github.com/user/old', 'plans', 'github.com/user/middle', 'github.com/user/new')
+                  if (root / key).exists())
+
+
+def test_prune_evicts_least_recently_used_first(cache_dir):
+    evicted, freed = cache.prune(budget_without('github.com/user/old', 'plans'))
+    assert [entry['key'] for entry in evicted] == ['github.com/user/old', 'plans']
+    assert freed == sum(entry['size'] for entry in evicted)
+    assert remaining(cache_dir) == ['github.com/user/middle', 'github.com/user/new']
+    assert not (cache_dir / 'github.com' / 'user' / 'old').exists()
+    assert (cache_dir / 'registry').exists()
+    assert set(json.loads((cache_dir / 'usage.json').read_text())) == {'github.com/user/middle', 'github.com/user/new'}
+
+
+def test_prune_never_evicts_entries_in_use_or_kept(cache_dir):
+    budget = budget_without('github.com/user/old', 'plans')
+    lock = cache.acquire(cache_dir / 'github.com' / 'user' / 'old', shared=True)
+    try:
+        evicted, _ = cache.prune(budget, keep=[cache_dir / 'plans'])
+    finally:
+        lock.close()
+    # The next oldest entries go instead
+    assert [entry['key'] for entry in evicted] == ['github.com/user/middle', 'github.com/user/new']
+    assert remaining(cache_dir) == ['github.com/user/old', 'plans']
+
+
+def test_prune_within_budget_evicts_nothing(cache_dir):
+    assert cache.prune(budget_without()) == ([], 0)
+    assert len(remaining(cache_dir)) == 4
+
+
+def test_unshareable_shared_lock_is_not_waited_for(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'SHARED_LOCKS', False)
+    path = tmp_path / 'entry'
+    lock = cache.acquire(path)
+    try:
+        start = time.monotonic()
+        assert cache.acquire(path, shared=True) is None
+        assert time.monotonic() - start < 1
+        cache.hold(path, None)
+        assert not cache.is_held(path)
+    finally:
+        lock.close()
+
+
+def test_unshareable_relock_keeps_exclusive_lock(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'SHARED_LOCKS', False)
+    path = tmp_path / 'entry'
+    lock = cache.acquire(path)
+    try:
+        assert cache.relock(lock, shared=True)
+        assert cache.acquire(path, blocking=False) is None
+    finally:
+        lock.close()
@@ -0,0 +1,142 @@
+"""
+Tests ranking in the template catalogue and rebuilding only the segments
+whose source changed.
+"""
+
+import json
+
+import pytest
+
+from boilerplates import catalogue as catalogue_module
+from boilerplates.catalogue import (
+    FIELD_WEIGHTS,
+    FUZZY_SIMILARITY,
+    PREFIX_SIMILARITY,
+    Catalogue,
+    build_segment,
+    update_catalogue,
+)
+
+
+def document(category, name, title='', description='', tags=()):
+    return {'category': category, 'name': name, 'title': title, 'description': description,
+            'tags': list(tags), 'source': 'public'}
+
+
+def search(documents, query, limit=None):
+    catalogue = Catalogue({'public': build_segment('test', documents)})
+    return [(score, d['name']) for score, d in catalogue.search(query, limit)]
+
+
+def test_matching_more_terms_ranks_first():
+    results = search([
+        document('react', 'react_spa', title='React SPA'),
+        document('python', 'flask_api', description='An admin dashboard for react apps'),
+    ], 'react dashboard')
+    # Both terms only in the description still beat one term in the name
+    assert results == [
+        (pytest.approx(2 * FIELD_WEIGHTS['description']), 'flask_api'),
+        (pytest.approx(FIELD_WEIGHTS['name']), 'react_spa'),
+    ]
+
+
+def test_best_field_weight_counts_once_per_term():
+    results = search([
+        document('php', 'theme', description='flask flask flask'),
+        document('php', 'flask', tags=['flask']),
+        document('php', 'starter', tags=['flask']),
+    ], 'flask')
+    assert results == [
+        (pytest.approx(FIELD_WEIGHTS['name']), 'flask'),
+        (pytest.approx(FIELD_WEIGHTS['tags']), 'starter'),
+        (pytest.approx(FIELD_WEIGHTS['description']), 'theme'),
+    ]
+
+
+def test_exact_match_beats_prefix_match():
+    results = search([
+        document('react', 'dashboard_kit'),
+        document('react', 'dash'),
+    ], 'dash')
+    assert results == [
+        (pytest.approx(FIELD_WEIGHTS['name']), 'dash'),
+        (pytest.approx(FIELD_WEIGHTS['name'] * PREFIX_SIMILARITY), 'dashboard_kit'),
+    ]
+
+
+def test_misspelling_matches_fuzzily_only_without_exact_or_prefix_match():
+    documents = [document('react', 'dashboard'), document('python', 'dashbored')]
+    [(score, name)] = search(documents[:1], 'dashbord')
+    assert name == 'dashboard'
+    assert 0 < score < FIELD_WEIGHTS['name'] * FUZZY_SIMILARITY
+
+    # 'dashbo' is a prefix of both, so no fuzzy matching happens
+    assert sorted(name for _, name in search(documents, 'dashbo')) == ['dashboard', 'dashbored']
+    assert search(documents, 'dashbored') == [(pytest.approx(FIELD_WEIGHTS['name']), 'dashbored')]
+    assert search(documents, 'xy') == []
+
+
+def test_ties_are_broken_by_category_then_name():
+    results = search([
+        document('react', 'b', tags=['api']),
+        document('python', 'z', tags=['api']),
+        document('react', 'a', tags=['api']),
+    ], 'api')
+    assert [name for _, name in results] == ['z', 'a', 'b']
+
+
+def test_limit_applies_across_segments():
+    catalogue = Catalogue({
+        'local': build_segment('1', [document('react', 'cli_tool', tags=['cli']), document('react', 'other', description='cli')]),
+        'public': build_segment('2', [document('python', 'cli'), document('python', 'api', description='cli')]),
+    })
+    assert [(d['category'], d['name']) for _, d in catalogue.search('cli', limit=2)] == [
+        ('python', 'cli'), ('react', 'cli_tool')]
+    assert [(d['category'], d['name']) for _, d in catalogue.search('cli', limit=3)] == [
+        ('python', 'cli'), ('react', 'cli_tool'), ('python', 'api')]
+    assert len(catalogue.search('cli')) == 4
+
+
+@pytest.fixture
+def catalogue_file(tmp_path, monkeypatch):
+    path = tmp_path / 'catalogue.json'
+    monkeypatch.setattr(catalogue_module, 'CATALOGUE_FILE', path)
+    return path
+
+
+def test_update_rebuilds_only_changed_segments(tmp_path, catalogue_file, monkeypatch):
+    templates_dir = tmp_path / 'templates'
+    (templates_dir / 'python' / 'flask_app').mkdir(parents=True)
+    config_file = templates_dir / 'python' / 'flask_app' / 'template.json'
+    config_file.write_text(json.dumps({'name': 'Flask App', 'tags': ['web']}), encoding='utf-8')
+    templates = {'python': [
+        {'name': 'flask_app', 'source': 'local'},
+        {'name': 'django_app', 'source': 'public', 'description': 'Django starter'},
+    ]}
+
+    built = []
+
+    def counting_build_segment(fingerprint, documents):
+        built.append(sorted(d['source'] for d in documents))
+        return build_segment(fingerprint, documents)
+
+    monkeypatch.setattr(catalogue_module, 'build_segment', counting_build_segment)
+    assert [d['name'] for _, d in update_catalogue(templates, templates_dir).search('web')] == ['flask_app']
+    assert built == [['local'], ['public'], []]
+
+    built.clear()
+    saved = catalogue_file.stat().st_mtime_ns
+    update_catalogue(templates, templates_dir)
+    assert built == []
+    assert catalogue_file.stat().st_mtime_ns == saved
+
+    templates['python'][1]['description'] = 'Django web starter'
+    catalogue = update_catalogue(templates, templates_dir)
+    assert built == [['public']]
+    assert sorted(d['name'] for _, d in catalogue.search('web')) == ['django_app', 'flask_app']
+
+    built.clear()
+    config_file.write_text(json.dumps({'name': 'Flask App', 'tags': ['rest', 'api']}), encoding='utf-8')
+    catalogue = update_catalogue(templates, templates_dir)
+    assert built == [['local']]
+    assert [d['name'] for _, d in catalogue.search('web')] == ['django_app']
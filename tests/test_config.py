@@ -0,0 +1,38 @@
+"""
+Tests the atomic JSON writes every cache file goes through.
+"""
+
+import json
+
+import pytest
+
+from boilerplates.config import write_json
+
+
+def test_write_json_replaces_file(tmp_path):
+    path = tmp_path / 'nested' / 'data.json'
+    write_json(path, {'a': 1})
+    write_json(path, {'a': 2}, indent=2)
+    assert json.loads(path.read_text(encoding='utf-8')) == {'a': 2}
+    assert [p.name for p in path.parent.iterdir()] == ['data.json']
+
+
+def test_write_json_failure_keeps_old_content_and_no_temp_file(tmp_path):
+    path = tmp_path / 'data.json'
+    write_json(path, {'a': 1})
+    with pytest.raises(TypeError):
+        write_json(path, {'a': object()})
+    assert json.loads(path.read_text(encoding='utf-8')) == {'a': 1}
+    assert [p.name for p in tmp_path.iterdir()] == ['data.json']
+
+
+def test_save_config_is_atomic(tmp_path, monkeypatch):
+    from boilerplates import config as cfg
+
+    monkeypatch.setattr(cfg, 'CONFIG_FILE', tmp_path / 'config.json')
+    cfg.save_config(dict(cfg.DEFAULT_CONFIG, link_mode='reflink'))
+    monkeypatch.setattr(cfg.json, 'dump', lambda *args, **kwargs: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        cfg.save_config(dict(cfg.DEFAULT_CONFIG, link_mode='hardlink'))
+    assert cfg.load_config()['link_mode'] == 'reflink'
+    assert [p.name for p in tmp_path.iterdir()] == ['config.json']
@@ -0,0 +1,44 @@
+"""
+Tests the {{ name | filter }} variable filters and their defaults.
+"""
+
+import pytest
+
+from boilerplates.render import camel_case, kebab_case, pascal_case, render_text
+
+
+@pytest.mark.parametrize('text, kebab, pascal, camel', [
+    ('My Cool App', 'my-cool-app', 'MyCoolApp', 'myCoolApp'),
+    ('  My   Cool App ', 'my-cool-app', 'MyCoolApp', 'myCoolApp'),
+    ('my_cool_app', 'my-cool-app', 'MyCoolApp', 'myCoolApp'),
+    ('my-cool-app', 'my-cool-app', 'MyCoolApp', 'myCoolApp'),
+    ('myCoolApp', 'my-cool-app', 'MyCoolApp', 'myCoolApp'),
+    ('MyCoolApp', 'my-cool-app', 'MyCoolApp', 'myCoolApp'),
+    ('HTTPServer', 'http-server', 'HttpServer', 'httpServer'),
+    ('getHTTPResponse', 'get-http-response', 'GetHttpResponse', 'getHttpResponse'),
+    ('Version 2 App', 'version-2-app', 'Version2App', 'version2App'),
+    ('api_v2_client', 'api-v-2-client', 'ApiV2Client', 'apiV2Client'),
+    ('', '', '', ''),
+    ('--', '', '', ''),
+])
+def test_case_filters(text, kebab, pascal, camel):
+    assert kebab_case(text) == kebab
+    assert pascal_case(text) == pascal
+    assert camel_case(text) == camel
+
+
+@pytest.mark.parametrize('text, variables, expected', [
+    ('{{ name | default("My App") }}', {'name': ''}, 'My App'),
+    ('{{ name | default("My App") }}', {'name': None}, 'My App'),
+    ('{{ name | default("My App") }}', {}, 'My App'),
+    ('{{ name | default("My App") }}', {'name': 'Shop'}, 'Shop'),
+    ("{{name|default('')}}", {}, ''),
+    ('{{ name | default("My App") | kebab_case }}', {'name': ''}, 'my-app'),
+    ('{{ name | kebab_case | default("fallback") }}', {'name': ''}, 'fallback'),
+    ('{{ name | kebab_case | default("fallback") }}', {'name': '__'}, 'fallback'),
+    ('{{ name | pascal_case }}-{{ name | kebab_case }}', {'name': 'my_shop'}, 'MyShop-my-shop'),
+    ('{{ name | kebab_case }}', {}, '{{ name | kebab_case }}'),
+    ('{{ name | shout }}', {'name': 'Shop'}, '{{ name | shout }}'),
+])
+def test_render_text_filters(text, variables, expected):
+    assert render_text(text, variables) == expected
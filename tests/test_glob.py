@@ -0,0 +1,77 @@
+"""
+Pins the glob semantics of replace rules: '*' and '?' stay inside one path
+segment, and a '**' segment spans any number of directories, including none.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from boilerplates.cli import build_replace_rules, get_template_variables, load_template_config
+from boilerplates.render import PathMatcher, expand_brace_pattern, render_template
+
+ROOT = Path(__file__).resolve().parent.parent
+# The bundled templates, and the top-level copies the public registry points at
+TEMPLATE_TREES = [ROOT / 'boilerplates' / 'templates', ROOT / 'templates']
+
+
+@pytest.mark.parametrize('pattern, path, expected', [
+    ('**/*.js', 'index.js', True),
+    ('**/*.js', 'src/index.js', True),
+    ('**/*.js', 'src/components/App.js', True),
+    ('**/*.js', 'index.jsx', False),
+    ('*.js', 'index.js', True),
+    ('*.js', 'src/index.js', False),
+    ('src/*.js', 'src/index.js', True),
+    ('src/*.js', 'src/components/App.js', False),
+    ('src/**/*.js', 'src/index.js', True),
+    ('src/**/*.js', 'src/components/App.js', True),
+    ('src/**/*.js', 'lib/index.js', False),
+    ('src/**', 'src/components/App.js', True),
+    ('{**/*,*}.py', 'setup.py', True),
+    ('{**/*,*}.py', 'myproject/core/base.py', True),
+    ('.env*', '.env', True),
+    ('.env*', '.env.example', True),
+    ('.env*', 'config/.env', False),
+    ('?.md', 'a.md', True),
+    ('?.md', 'ab.md', False),
+    ('a?b', 'a/b', False),
+    ('[abc].txt', 'b.txt', True),
+    ('[!abc].txt', 'b.txt', False),
+    ('[!abc].txt', 'd.txt', True),
+    ('docker-compose.yml', 'docker-compose.yml', True),
+    ('docker-compose.yml', 'deploy/docker-compose.yml', False),
+])
+def test_path_matcher(pattern, path, expected):
+    assert PathMatcher(pattern).match(path) is expected
+
+
+def test_path_matcher_merges_patterns():
+    matcher = PathMatcher(['*.md', 'docs/**/*.{rst,txt}'])
+    assert matcher.match('README.md')
+    assert matcher.match('docs/api/index.rst')
+    assert matcher.match('docs/notes.txt')
+    assert not matcher.match('docs/README.md')
+    assert not PathMatcher([]).match('README.md')
+
+
+def test_expand_brace_pattern():
+    assert expand_brace_pattern('**/*.{py, md}') == ['**/*.py', '**/*.md']
+    assert expand_brace_pattern('{a,b}/*.{x,y}') == ['a/*.x', 'a/*.y', 'b/*.x', 'b/*.y']
+    assert expand_brace_pattern('*.py') == ['*.py']
+
+
+@pytest.mark.parametrize('templates_dir', TEMPLATE_TREES, ids=['bundled', 'registry'])
+@pytest.mark.parametrize('template_name', ['react_dashboard', 'react_embedded', 'react_marketing'])
+def test_react_package_name_stays_valid(tmp_path, templates_dir, template_name):
+    # '**/*.json' also matches the top-level package.json, whose name must stay a valid npm name
+    template_path = templates_dir / 'react' / template_name
+    template_config = load_template_config(template_path)
+    variables = get_template_variables(template_config, 'My Dashboard')
+    rules = build_replace_rules(template_config, variables)
+
+    render_template(template_path, tmp_path, [], rules)
+
+    with open(tmp_path / 'package.json', 'r', encoding='utf-8') as f:
+        assert json.load(f)['name'] == 'my-dashboard-template'
@@ -0,0 +1,81 @@
+"""
+Tests project manifests: what generating a project keeps in the template
+store, and three-way merging locally modified files on update.
+"""
+
+import json
+
+import pytest
+
+from boilerplates import cli, store
+from boilerplates.manifest import read_manifest
+from boilerplates.plan import load_plan
+
+APP = "NAME = 'myproject'\nVERSION = 1\n\n\ndef main():\n    return NAME\n"
+CONFIG = {
+    'prompts': {'project_name': {'default': 'My Project'}, 'package_name': {'format': 'snake_case'}},
+    'replace': [{'glob': '**/*.py', 'values': {'myproject': '{{package_name}}'}}],
+}
+
+
+def write_template(path, app=APP, config=CONFIG):
+    path.mkdir(exist_ok=True)
+    (path / 'template.json').write_text(json.dumps(config), encoding='utf-8')
+    (path / 'app.py').write_text(app, encoding='utf-8')
+    (path / 'LICENSE').write_text('MIT\n', encoding='utf-8')
+
+
+def prepared(template_path):
+    config = cli.load_template_config(template_path)
+    return template_path, config, load_plan(template_path, config), {'category': 'tests', 'name': 'app'}
+
+
+def blobs():
+    return {path for path in store.OBJECTS_DIR.rglob('*') if path.is_file() and path.name != 'index.json'}
+
+
+@pytest.fixture
+def template(tmp_path, monkeypatch):
+    path = tmp_path / 'template'
+    write_template(path)
+    monkeypatch.setattr(cli, 'prepare_template', lambda category, name, templates=None: prepared(path))
+    return path
+
+
+def test_store_grows_once_per_template_version(tmp_path, template):
+    before = blobs()
+    assert cli.generate_project(prepared(template), 'tests/app', 'First App', output_dir=tmp_path, verbose=False)
+    after_first = blobs()
+    assert cli.generate_project(prepared(template), 'tests/app', 'Second App', output_dir=tmp_path, verbose=False)
+    assert blobs() == after_first
+
+    # Template sources and the configuration, never per-project outputs
+    assert len(after_first - before) == 3
+    files = read_manifest(tmp_path / 'second_app')['files']
+    assert files['app.py']['output_hash'] != files['app.py']['source_hash']
+    assert store.find_blob(files['app.py']['output_hash']) is None
+
+
+def test_update_merges_local_change_into_substituted_file(tmp_path, template):
+    assert cli.generate_project(prepared(template), 'tests/app', 'Demo', output_dir=tmp_path, verbose=False)
+    project = tmp_path / 'demo'
+    with open(project / 'app.py', 'a', encoding='utf-8') as f:
+        f.write("\n\nprint(main())\n")
+    write_template(template, APP.replace('VERSION = 1', 'VERSION = 22'))
+
+    assert cli.update_project(project)
+    app = (project / 'app.py').read_text(encoding='utf-8')
+    assert "NAME = 'demo'" in app and 'VERSION = 22' in app and 'print(main())' in app
+
+
+def test_update_merges_after_configuration_change(tmp_path, template):
+    assert cli.generate_project(prepared(template), 'tests/app', 'Demo', output_dir=tmp_path, verbose=False)
+    project = tmp_path / 'demo'
+    with open(project / 'app.py', 'a', encoding='utf-8') as f:
+        f.write("\n\nprint(main())\n")
+    config = dict(CONFIG, replace=[{'glob': '**/*.py', 'values': {'myproject': '{{package_name}}', 'VERSION': 'RELEASE'}}])
+    write_template(template, config=config)
+
+    assert cli.update_project(project)
+    app = (project / 'app.py').read_text(encoding='utf-8')
+    assert "NAME = 'demo'" in app and 'RELEASE = 1' in app and 'print(main())' in app
@@ -0,0 +1,32 @@
+"""
+Tests that cached render plans are rebuilt whenever the template changes.
+"""
+
+import json
+
+from boilerplates import cli
+from boilerplates.plan import load_plan
+
+
+def write_template(path):
+    path.mkdir()
+    (path / 'template.json').write_text(json.dumps({'replace': []}), encoding='utf-8')
+    (path / 'README.md').write_text('# myproject\n', encoding='utf-8')
+
+
+def test_new_empty_directory_invalidates_cached_plan(tmp_path):
+    template = tmp_path / 'template'
+    write_template(template)
+    config = cli.load_template_config(template)
+    assert load_plan(template, config).directories == ['']
+
+    (template / 'logs').mkdir()
+    plan = load_plan(template, config)
+    assert plan.directories == ['', 'logs']
+
+    prepared = (template, config, plan, {'category': 'tests', 'name': 'app'})
+    assert cli.generate_project(prepared, 'tests/app', 'Demo', output_dir=tmp_path / 'out', verbose=False)
+    assert (tmp_path / 'out' / 'demo' / 'logs').is_dir()
+
+    (template / 'logs').rmdir()
+    assert load_plan(template, config).directories == ['']
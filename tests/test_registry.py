@@ -0,0 +1,86 @@
+"""
+Tests the on-disk registry cache against a local stand-in for the registry
+server: a fresh fetch, a 304 revalidation, and stale-if-error.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from boilerplates.registry import RegistryError, fetch_registry
+
+REGISTRY = {'python': [{'name': 'python_api', 'repo': 'https://example.com/python_api.git'}]}
+ETAG = '"v1"'
+
+
+class RegistryHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if server.fail:
+            self.send_error(500)
+        elif self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+        else:
+            body = json.dumps(REGISTRY).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(('127.0.0.1', 0), RegistryHandler)
+    httpd.requests = []
+    httpd.fail = False
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _url(server, name):
+    return f"http://127.0.0.1:{server.server_address[1]}/{name}.json"
+
+
+def test_fetch_caches_and_skips_network_within_ttl(server):
+    url = _url(server, 'fresh')
+    assert fetch_registry(url, ttl=3600) == REGISTRY
+    assert fetch_registry(url, ttl=3600) == REGISTRY
+    assert len(server.requests) == 1
+
+
+def test_expired_copy_is_revalidated_with_etag(server):
+    url = _url(server, 'revalidate')
+    assert fetch_registry(url, ttl=0) == REGISTRY
+    assert 'If-None-Match' not in server.requests[0]
+
+    assert fetch_registry(url, ttl=0) == REGISTRY
+    assert server.requests[1]['If-None-Match'] == ETAG
+
+
+def test_stale_copy_is_used_when_refresh_fails(server):
+    url = _url(server, 'stale')
+    assert fetch_registry(url, ttl=0) == REGISTRY
+
+    server.fail = True
+    warnings = []
+    assert fetch_registry(url, ttl=0, warn=warnings.append) == REGISTRY
+    assert len(server.requests) == 2
+    assert len(warnings) == 1 and 'using cached copy' in warnings[0]
+
+
+def test_failure_without_cached_copy_raises(server):
+    server.fail = True
+    with pytest.raises(RegistryError):
+        fetch_registry(_url(server, 'missing'), ttl=0)
@@ -0,0 +1,115 @@
+"""
+Tests fetching remote templates from a temporary bare repository: sparse
+checkouts of a subdirectory, pinned commits, and refreshing a checkout.
+"""
+
+import subprocess
+
+import pytest
+
+from boilerplates.remote import FetchError, fetch_template, head_commit, needs_update, template_cache_path
+
+
+def git(*args, cwd=None):
+    command = ['git', '-c', 'user.name=Tests', '-c', 'user.email=tests@example.com']
+    if cwd is not None:
+        command += ['-C', str(cwd)]
+    result = subprocess.run(command + list(args), check=True, capture_output=True)
+    return result.stdout.decode().strip()
+
+
+def commit_files(work, files, message):
+    for name, content in files.items():
+        path = work / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+    git('add', '-A', cwd=work)
+    git('commit', '--quiet', '-m', message, cwd=work)
+    git('push', '--quiet', 'origin', 'HEAD:main', cwd=work)
+    return git('rev-parse', 'HEAD', cwd=work)
+
+
+@pytest.fixture
+def repository(tmp_path):
+    """A bare repository holding two templates, and a working clone to push to it."""
+    bare = tmp_path / 'templates.git'
+    git('init', '--quiet', '--bare', '--initial-branch=main', str(bare))
+    git('config', 'uploadpack.allowFilter', 'true', cwd=bare)
+    git('config', 'uploadpack.allowAnySHA1InWant', 'true', cwd=bare)
+    work = tmp_path / 'work'
+    git('clone', '--quiet', str(bare), str(work))
+    first = commit_files(work, {
+        'flask/template.json': '{"name": "Flask"}',
+        'flask/app.py': 'VERSION = 1\n',
+        'django/template.json': '{"name": "Django"}',
+        'django/big.bin': 'x' * 100000,
+    }, 'First')
+    return bare.as_uri(), work, first
+
+
+def local_objects(checkout):
+    """The objects a checkout has downloaded; listing them never fetches missing ones."""
+    output = git('cat-file', '--batch-all-objects', '--batch-check=%(objectname)', cwd=checkout)
+    return set(output.split())
+
+
+def test_sparse_checkout_only_downloads_its_subdirectory(repository):
+    url, work, _ = repository
+    template = fetch_template(url, subpath='flask')
+    checkout = template_cache_path(url, 'flask')
+
+    assert (template / 'app.py').read_text() == 'VERSION = 1\n'
+    assert not (checkout / 'django').exists()
+    assert git('rev-parse', 'HEAD:django/big.bin', cwd=work) not in local_objects(checkout)
+    assert git('rev-parse', '--is-shallow-repository', cwd=checkout) == 'true'
+
+
+def test_pinned_commit_is_checked_out(repository):
+    url, work, first = repository
+    commit_files(work, {'flask/app.py': 'VERSION = 2\n'}, 'Second')
+
+    template = fetch_template(url, subpath='flask', commit=first)
+    assert (template / 'app.py').read_text() == 'VERSION = 1\n'
+    assert head_commit(template_cache_path(url, 'flask')) == first
+    assert not needs_update(template_cache_path(url, 'flask'), first)
+
+
+def test_checkout_is_refreshed_once_stale(repository):
+    url, work, _ = repository
+    template = fetch_template(url, subpath='flask')
+    second = commit_files(work, {'flask/app.py': 'VERSION = 2\n'}, 'Second')
+
+    fetch_template(url, subpath='flask', max_age=3600)
+    assert (template / 'app.py').read_text() == 'VERSION = 1\n'
+
+    fetch_template(url, subpath='flask', max_age=0)
+    assert (template / 'app.py').read_text() == 'VERSION = 2\n'
+    assert head_commit(template_cache_path(url, 'flask')) == second
+
+
+def test_abbreviated_pin_is_resolved(repository):
+    url, work, first = repository
+    commit_files(work, {'flask/app.py': 'VERSION = 2\n'}, 'Second')
+
+    template = fetch_template(url, subpath='flask', commit=first[:7].upper())
+    checkout = template_cache_path(url, 'flask')
+    assert (template / 'app.py').read_text() == 'VERSION = 1\n'
+    assert head_commit(checkout) == first
+    assert not needs_update(checkout, first[:7])
+
+
+def test_abbreviated_pin_resolves_in_a_shallow_checkout(repository):
+    url, work, first = repository
+    commit_files(work, {'flask/app.py': 'VERSION = 2\n'}, 'Second')
+    fetch_template(url, subpath='flask')
+
+    template = fetch_template(url, subpath='flask', commit=first[:7])
+    assert (template / 'app.py').read_text() == 'VERSION = 1\n'
+
+
+@pytest.mark.parametrize('commit', ['0000000', 'main'])
+def test_unknown_pin_is_rejected(repository, commit):
+    url, _, _ = repository
+    with pytest.raises(FetchError, match='Pinned commit'):
+        fetch_template(url, subpath='flask', commit=commit)
+    assert not template_cache_path(url, 'flask').exists()
@@ -0,0 +1,72 @@
+"""
+Tests the byte-level pre-screen deciding which files need substitution, and
+that rendering in parallel writes the same project as rendering serially.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from boilerplates import cli, render
+from boilerplates.plan import load_plan
+from boilerplates.render import Replacer, compile_bytes_pattern, needs_substitution, render_template, search_file
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / 'boilerplates' / 'templates'
+
+
+def test_search_file_reports_every_pattern_that_occurs(tmp_path):
+    path = tmp_path / 'app.py'
+    path.write_bytes(b"import myproject\nprint('MyProject')\n")
+    patterns = [compile_bytes_pattern(keys) for keys in (['myproject'], ['absent'], ['MyProject'])]
+    assert search_file(path, patterns) == [0, 2]
+
+
+def test_search_file_finds_keys_overlapping_another_patterns_match(tmp_path):
+    path = tmp_path / 'app.py'
+    path.write_bytes(b'myproject_name\n')
+    patterns = [compile_bytes_pattern(['myproject']), compile_bytes_pattern(['project_name'])]
+    assert search_file(path, patterns) == [0, 1]
+
+
+def test_search_file_handles_empty_files(tmp_path):
+    path = tmp_path / 'empty.txt'
+    path.write_bytes(b'')
+    assert search_file(path, [compile_bytes_pattern(['myproject'])]) == []
+    assert search_file(path, []) == []
+
+
+def test_needs_substitution_checks_keys_of_all_replacers(tmp_path):
+    path = tmp_path / 'README.md'
+    path.write_text('# Café PROJECT_NAME_PLACEHOLDER\n', encoding='utf-8')
+    first = Replacer({'myproject': 'shop'})
+    second = Replacer({'PROJECT_NAME_PLACEHOLDER': 'Shop'})
+    assert needs_substitution(path, [first, second])
+    assert not needs_substitution(path, [first])
+    assert not needs_substitution(path, [Replacer({})])
+    assert needs_substitution(path, [Replacer({'Café': 'Bar'})])
+
+
+def tree(root):
+    return {
+        path.relative_to(root).as_posix(): (path.read_bytes(), path.stat().st_mode) if path.is_file() else None
+        for path in root.rglob('*')
+    }
+
+
+@pytest.mark.parametrize('use_plan', [False, True])
+def test_parallel_render_matches_serial_render(tmp_path, monkeypatch, use_plan):
+    template = TEMPLATES_DIR / 'python' / 'python_client_flask'
+    config = cli.load_template_config(template)
+    variables = cli.get_template_variables(config, 'My Cool App')
+    renames = cli.resolve_renames(config, variables)
+    rules = cli.build_replace_rules(config, variables)
+    plan = load_plan(template, config) if use_plan else None
+
+    render_template(template, tmp_path / 'serial', renames, rules, jobs=1, plan=plan)
+    # Send every substituted file through the process pool
+    monkeypatch.setattr(render, 'LARGE_FILE_THRESHOLD', 1)
+    render_template(template, tmp_path / 'parallel', renames, rules, jobs=4, plan=plan)
+
+    serial = tree(tmp_path / 'serial')
+    assert any(content and b'my_cool_app' in content[0] for content in serial.values())
+    assert tree(tmp_path / 'parallel') == serial
@@ -0,0 +1,52 @@
+"""
+Tests the phases --timings reports for creating a project.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from boilerplates import cli, timings
+from boilerplates.plan import load_plan
+from boilerplates.render import render_template
+
+TEMPLATE = Path(__file__).resolve().parent.parent / 'boilerplates' / 'templates' / 'react' / 'react_spa'
+
+
+@pytest.fixture
+def recording(monkeypatch):
+    # Restores the disabled state afterwards
+    monkeypatch.setattr(timings, '_phases', None)
+    monkeypatch.setattr(timings, '_started', None)
+    timings.enable()
+
+
+def phases():
+    return {entry['name']: entry for entry in timings.report()['phases']}
+
+
+def test_create_reports_match_and_replace_phases(tmp_path, recording):
+    config = cli.load_template_config(TEMPLATE)
+    prepared = (TEMPLATE, config, load_plan(TEMPLATE, config), {'category': 'react', 'name': 'react_spa'})
+    assert cli.generate_project(prepared, 'react/react_spa', 'Shop', output_dir=tmp_path, verbose=False)
+
+    recorded = phases()
+    assert [name for name in recorded if name.startswith('generate_project')] == [
+        'generate_project',
+        'generate_project/compile rules',
+        'generate_project/render_template',
+        'generate_project/render_template/match',
+        'generate_project/render_template/directories',
+        'generate_project/render_template/replace',
+        'generate_project/manifest',
+    ]
+    replace = recorded['generate_project/render_template/replace']
+    # Every file but the manifest
+    assert replace['files'] == sum(1 for path in (tmp_path / 'shop').rglob('*') if path.is_file()) - 1
+    assert replace['bytes'] > 0
+    assert 0 < recorded['generate_project/render_template/match']['files'] <= replace['files']
+
+
+def test_walking_a_template_is_reported_under_match(tmp_path, recording):
+    render_template(TEMPLATE, tmp_path, [], [])
+    assert 'render_template/match/plan_template' in phases()